@@ -11,7 +11,13 @@ from musicxml_to_png.extract import (
     build_measure_offset_map,
     detect_note_connections,
 )
-from musicxml_to_png.models import DEFAULT_STACCATO_FACTOR, MIN_STACCATO_FACTOR, MAX_STACCATO_FACTOR, RehearsalMark
+from musicxml_to_png.models import (
+    DEFAULT_STACCATO_FACTOR,
+    MIN_STACCATO_FACTOR,
+    MAX_STACCATO_FACTOR,
+    NoteEventArray,
+    RehearsalMark,
+)
 from musicxml_to_png.visualize import (
     ConnectionConfig,
     VisualizationConfig,
@@ -235,12 +241,14 @@ def convert_musicxml_to_png(
     if show_connections:
         connections = detect_note_connections(note_events)
 
-    bounds = compute_plot_bounds(note_events, score_duration)
+    # Columns built once serve both the tick bounds here and every pass in create_visualization
+    event_array = NoteEventArray.from_events(note_events)
+    bounds = compute_plot_bounds(event_array, score_duration)
     _, time_padding, _ = compute_padding(bounds, minimal, rehearsal_marks)
     tick_spec = generate_time_ticks(bounds, timeline_unit, measure_ticks, time_padding)
 
     viz_inputs = VisualizationInputs(
-        note_events=note_events,
+        note_events=event_array,
         rehearsal_marks=rehearsal_marks,
         measure_ticks=measure_ticks,
         connections=connections,
@@ -248,7 +256,7 @@ def convert_musicxml_to_png(
     )
 
     create_visualization(
-        note_events,
+        event_array,
         output_path,
         effective_title,
         score_duration,
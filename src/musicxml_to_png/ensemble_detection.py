@@ -19,7 +19,7 @@ from musicxml_to_png.instruments import (
     ORCHESTRA_STRINGS,
     ORCHESTRA_UNKNOWN,
     ORCHESTRA_WINDS,
-    get_instrument_family,
+    get_instrument_families,
 )
 
 # Weight tables give more credit to canonical families for each ensemble.
@@ -77,16 +77,25 @@ def _compute_confidence_orchestra(family_counts: Counter, total_parts: int) -> f
     bonus = 0.0
     penalty = 0.0
 
-    strings_ratio = family_counts.get(ORCHESTRA_STRINGS, 0) / total_parts
-    winds_present = family_counts.get(ORCHESTRA_WINDS, 0) > 0
-    brass_present = family_counts.get(ORCHESTRA_BRASS, 0) > 0
-    percussion_present = family_counts.get(ORCHESTRA_PERCUSSION, 0) > 0
-    families_present = sum(
-        1
+    strings, winds, brass, percussion = (
+        family_counts.get(key, 0)
         for key in (ORCHESTRA_STRINGS, ORCHESTRA_WINDS, ORCHESTRA_BRASS, ORCHESTRA_PERCUSSION)
-        if family_counts.get(key, 0) > 0
     )
 
+    bigband_like_parts = sum(
+        family_counts.get(key, 0)
+        for key in (BIGBAND_SAXOPHONES, BIGBAND_TRUMPETS, BIGBAND_TROMBONES, BIGBAND_RHYTHM_SECTION)
+    )
+
+    # Every ratio is divided exactly once here; the thresholds below compare against exact
+    # quotients (e.g. 7/35 >= 0.2), which multiplying by 1/total_parts would not preserve.
+    strings_ratio = strings / total_parts
+    bigband_ratio = bigband_like_parts / total_parts
+    winds_present = winds > 0
+    brass_present = brass > 0
+    percussion_present = percussion > 0
+    families_present = (strings > 0) + winds_present + brass_present + percussion_present
+
     if strings_ratio >= 0.3:
         bonus += 0.25
     if strings_ratio >= 0.45:
@@ -118,13 +127,6 @@ def _compute_confidence_orchestra(family_counts: Counter, total_parts: int) -> f
     if families_present <= 1:
         final *= 0.25
 
-    bigband_like_parts = (
-        family_counts.get(BIGBAND_SAXOPHONES, 0)
-        + family_counts.get(BIGBAND_TRUMPETS, 0)
-        + family_counts.get(BIGBAND_TROMBONES, 0)
-        + family_counts.get(BIGBAND_RHYTHM_SECTION, 0)
-    )
-    bigband_ratio = bigband_like_parts / total_parts
     if bigband_ratio > 0.5 and strings_ratio < 0.4:
         final *= 0.6
     if bigband_ratio > 0.65 and strings_ratio < 0.4:
@@ -140,14 +142,19 @@ def _compute_confidence_bigband(family_counts: Counter, orchestra_family_counts:
     bonus = 0.0
     penalty = 0.0
 
-    saxes = family_counts.get(BIGBAND_SAXOPHONES, 0)
-    trumpets = family_counts.get(BIGBAND_TRUMPETS, 0)
-    bones = family_counts.get(BIGBAND_TROMBONES, 0)
-    rhythm = family_counts.get(BIGBAND_RHYTHM_SECTION, 0)
-    unknown_ratio = family_counts.get(BIGBAND_UNKNOWN, 0) / total_parts
-    strings_like_ratio = family_counts.get(ORCHESTRA_STRINGS, 0) / total_parts
-    alt_strings_ratio = orchestra_family_counts.get(ORCHESTRA_STRINGS, 0) / total_parts
-    strings_like_ratio = max(strings_like_ratio, alt_strings_ratio)
+    saxes, trumpets, bones, rhythm, unknown = (
+        family_counts.get(key, 0)
+        for key in (BIGBAND_SAXOPHONES, BIGBAND_TRUMPETS, BIGBAND_TROMBONES, BIGBAND_RHYTHM_SECTION, BIGBAND_UNKNOWN)
+    )
+    sections_present = int(saxes > 0) + int((trumpets + bones) > 0) + int(rhythm > 0)
+    if sections_present == 0:
+        return 0.0
+
+    # Every ratio is divided exactly once here (see _compute_confidence_orchestra)
+    strings_like = max(family_counts.get(ORCHESTRA_STRINGS, 0), orchestra_family_counts.get(ORCHESTRA_STRINGS, 0))
+    unknown_ratio = unknown / total_parts
+    strings_like_ratio = strings_like / total_parts
+    core_ratio = (saxes + trumpets + bones + rhythm) / total_parts
 
     if saxes > 0:
         bonus += 0.2
@@ -178,14 +185,8 @@ def _compute_confidence_bigband(family_counts: Counter, orchestra_family_counts:
     base = _base_confidence(family_counts, _BIGBAND_WEIGHTS, total_parts)
     final = base + bonus - penalty
 
-    sections_present = int(saxes > 0) + int((trumpets + bones) > 0) + int(rhythm > 0)
-    coverage_factor = sections_present / 3 if sections_present > 0 else 0.0
-    final *= coverage_factor
-    if sections_present == 0:
-        return 0.0
+    final *= sections_present / 3
 
-    core_parts = saxes + trumpets + bones + rhythm
-    core_ratio = core_parts / total_parts
     if core_ratio < 0.6:
         final *= core_ratio / 0.6
     if core_ratio < 0.25:
@@ -194,28 +195,31 @@ def _compute_confidence_bigband(family_counts: Counter, orchestra_family_counts:
     return final
 
 
-def _compute_confidence_ensemble(parts_meta: List[tuple], ensemble: str) -> float:
-    """Compute a normalized confidence for how well parts match an ensemble."""
-    if not parts_meta:
-        return 0.0
-
-    family_counts: Counter = Counter()
-    orchestra_family_counts: Counter = Counter()
+def _count_families(parts_meta: List[tuple]) -> Tuple[Counter, Counter]:
+    """Classify every part once, returning (bigband_counts, orchestra_counts)."""
+    bigband_counts: Counter = Counter()
+    orchestra_counts: Counter = Counter()
 
     for midi_program, instrument_name in parts_meta:
-        family = get_instrument_family(
+        bigband_family, orchestra_family = get_instrument_families(
             midi_program=midi_program,
             instrument_name=instrument_name,
-            ensemble=ensemble,
+            ensembles=(ENSEMBLE_BIGBAND, ENSEMBLE_ORCHESTRA),
         )
-        family_counts[family] += 1
+        bigband_counts[bigband_family] += 1
+        orchestra_counts[orchestra_family] += 1
 
-        orchestra_family = get_instrument_family(
-            midi_program=midi_program,
-            instrument_name=instrument_name,
-            ensemble=ENSEMBLE_ORCHESTRA,
-        )
-        orchestra_family_counts[orchestra_family] += 1
+    return bigband_counts, orchestra_counts
+
+
+def _compute_confidence_ensemble(
+    family_counts: Counter,
+    orchestra_family_counts: Counter,
+    ensemble: str,
+) -> float:
+    """Compute a normalized confidence for how well classified parts match an ensemble."""
+    if not family_counts:
+        return 0.0
 
     total_parts = max(1, sum(family_counts.values()))
 
@@ -239,10 +243,18 @@ def detect_ensembles(score: stream.Score) -> List[Tuple[str, float]]:
     if not parts_meta:
         return [(ENSEMBLE_UNGROUPED, 0.0)]
 
+    bigband_counts, orchestra_counts = _count_families(parts_meta)
+    counts_by_ensemble = {
+        ENSEMBLE_BIGBAND: bigband_counts,
+        ENSEMBLE_ORCHESTRA: orchestra_counts,
+    }
+
     candidates = [ENSEMBLE_BIGBAND, ENSEMBLE_ORCHESTRA]
 
-    scores = [(ensemble, _compute_confidence_ensemble(parts_meta, ensemble)) for ensemble in candidates]
+    scores = [
+        (ensemble, _compute_confidence_ensemble(counts_by_ensemble[ensemble], orchestra_counts, ensemble))
+        for ensemble in candidates
+    ]
     scores.sort(key=lambda item: item[1], reverse=True)
     scores.append((ENSEMBLE_UNGROUPED, 0.0))
     return scores
-
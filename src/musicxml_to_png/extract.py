@@ -1,7 +1,11 @@
 """Extraction helpers: measure timelines, rehearsal marks, and note events."""
 
-from typing import Dict, List, Optional, Tuple
+import heapq
+import math
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Optional, Tuple
 
+import numpy as np
 from music21 import chord, dynamics, expressions, instrument, note, stream, articulations
 
 from musicxml_to_png.instruments import get_instrument_family
@@ -11,6 +15,7 @@ from musicxml_to_png.models import (
     MIN_DYNAMIC_LEVEL,
     DYNAMIC_MARK_LEVELS,
     NoteEvent,
+    NoteEventArray,
     RehearsalMark,
     _clamp_dynamic_level,
     DEFAULT_STACCATO_FACTOR,
@@ -22,6 +27,18 @@ from musicxml_to_png.models import (
 # EPS means epsilon (small difference)
 CONNECTION_TIME_EPS = 0.001
 
+# Case-folded dynamic mark -> loudness level, built once so the per-dynamic loop is a single probe
+_DYN_LOOKUP: Dict[str, float] = {mark.lower(): level for mark, level in DYNAMIC_MARK_LEVELS.items()}
+
+# Span of the dynamic scale that a normalized MIDI velocity is mapped onto
+_DYN_RANGE = MAX_DYNAMIC_LEVEL - MIN_DYNAMIC_LEVEL
+
+# Tie types encoded as small ints for the per-part tie buffer; "continue" is treated like no tie
+_TIE_NONE = 0
+_TIE_START = 1
+_TIE_STOP = 2
+_TIE_CODES: Dict[Optional[str], int] = {"start": _TIE_START, "stop": _TIE_STOP}
+
 
 def _build_measure_offset_map(score: stream.Score) -> tuple[Dict[str, float], float]:
     """
@@ -34,8 +51,8 @@ def _build_measure_offset_map(score: stream.Score) -> tuple[Dict[str, float], fl
         measure_offsets: mapping of measure number -> absolute start time
         total_duration: cumulative duration of all measures encountered
     """
-    measure_lengths: Dict[str, List[float]] = {}
-    measure_order: List[str] = []
+    # Shortest duration seen per measure number; dict insertion order is first-seen order
+    measure_lengths: Dict[str, float] = {}
 
     for part in score.parts:
         for measure in part.getElementsByClass(stream.Measure):
@@ -49,134 +66,263 @@ def _build_measure_offset_map(score: stream.Score) -> tuple[Dict[str, float], fl
             if duration is None:
                 continue
 
-            measure_lengths.setdefault(measure_num, []).append(duration)
-            if measure_num not in measure_order:
-                measure_order.append(measure_num)
+            # Keep the shortest duration to avoid inflated bars
+            shortest = measure_lengths.get(measure_num)
+            if shortest is None or duration < shortest:
+                measure_lengths[measure_num] = duration
 
     if not measure_lengths:
         return {}, float(score.duration.quarterLength)
 
-    # Use the shortest duration seen for each measure to avoid inflated bars
-    canonical_lengths: Dict[str, float] = {
-        num: min(durations) for num, durations in measure_lengths.items()
-    }
-
     measure_offsets: Dict[str, float] = {}
     current_offset = 0.0
-    for measure_num in measure_order:
+    for measure_num, duration in measure_lengths.items():
         measure_offsets[measure_num] = current_offset
-        current_offset += canonical_lengths.get(measure_num, 0.0)
+        current_offset += duration
 
     return measure_offsets, current_offset
 
 
+def _build_measure_offset_table(measure_offsets: Dict[str, float]) -> List[Optional[float]]:
+    """
+    Project string-keyed measure offsets onto a list indexed by integer measure number.
+
+    Measure numbers are small non-negative ints in practice, so a list index avoids the
+    str() + dict hash per element. Non-numeric or negative keys stay dict-only, and an
+    empty table is returned when numbering is too sparse for a dense list.
+    """
+    numeric_offsets: Dict[int, float] = {}
+    for key, offset in measure_offsets.items():
+        try:
+            measure_num = int(key)
+        except ValueError:
+            continue
+        if measure_num >= 0:
+            numeric_offsets[measure_num] = offset
+
+    if not numeric_offsets or max(numeric_offsets) > 4 * len(numeric_offsets) + 64:
+        return []
+
+    table: List[Optional[float]] = [None] * (max(numeric_offsets) + 1)
+    for measure_num, offset in numeric_offsets.items():
+        table[measure_num] = offset
+    return table
+
+
+def _measure_start_offset(
+    measure_num,
+    measure_offsets: Dict[str, float],
+    offset_table: Optional[List[Optional[float]]] = None,
+) -> Optional[float]:
+    """
+    Look up the canonical start offset of a measure number, or None when it is unknown.
+    """
+    if measure_num is None:
+        return None
+    if offset_table and type(measure_num) is int and 0 <= measure_num < len(offset_table):
+        measure_offset = offset_table[measure_num]
+        if measure_offset is not None:
+            return measure_offset
+    return measure_offsets.get(str(measure_num))
+
+
 def _absolute_offset_from_measure(
     element,
     score: stream.Score,
     measure_offsets: Dict[str, float],
+    offset_table: Optional[List[Optional[float]]] = None,
 ) -> float:
     """
     Compute an absolute offset using canonical measure offsets when available.
     Falls back to music21 hierarchy offsets if the measure is unknown.
+
+    When an offset_table from _build_measure_offset_table is given, integer measure
+    numbers are resolved by list index before falling back to the string-keyed map.
     """
     measure = element.getContextByClass(stream.Measure)
     measure_num = measure.number if measure is not None else getattr(element, "measureNumber", None)
-    inner_offset = float(getattr(element, "offset", 0.0))
-
-    if measure_num is not None:
-        key = str(measure_num)
-        if key in measure_offsets:
-            return measure_offsets[key] + inner_offset
+    measure_offset = _measure_start_offset(measure_num, measure_offsets, offset_table)
+    if measure_offset is not None:
+        return measure_offset + float(getattr(element, "offset", 0.0))
 
     return float(element.getOffsetInHierarchy(score))
 
 
-def _split_events_by_pitch_overlap(note_events: List[NoteEvent]) -> List[NoteEvent]:
+def _walk_part(
+    part: stream.Part,
+    measure_offsets: Dict[str, float],
+    offset_table: Optional[List[Optional[float]]] = None,
+) -> Iterator[Tuple[object, Optional[float], bool]]:
+    """
+    Yield every element of part in part.recurse() order as (element, measure_offset, voiced).
+
+    Elements inside a measure with a known canonical start get that start as measure_offset,
+    so their absolute offset is measure_offset + element.offset without a context search.
+    voiced is False only when a Voice context search for the element is known to find
+    nothing; measure_offset is None when the caller has to fall back to
+    _absolute_offset_from_measure.
+    """
+    # music21's Voice context search crosses measure boundaries within a part, so it can only
+    # be skipped when the part holds no voices at all
+    part_voiced = part.hasVoices() or any(
+        measure.hasVoices() for measure in part.getElementsByClass(stream.Measure)
+    )
+    for element in part:
+        yield element, None, True
+        if isinstance(element, stream.Measure):
+            measure_offset = _measure_start_offset(element.number, measure_offsets, offset_table)
+            for inner in element.recurse():
+                yield inner, measure_offset, part_voiced
+        elif element.isStream:
+            for inner in element.recurse():
+                yield inner, None, True
+
+
+def _apply_velocity(level: float, element) -> float:
+    """
+    Raise a timeline dynamic level to the element's MIDI velocity when that is louder,
+    then clamp to the supported range.
+    """
+    velocity_level = None
+    volume = getattr(element, "volume", None)
+    if volume:
+        if volume.velocity is not None:
+            vel_norm = max(0.0, min(1.0, volume.velocity / 127.0))
+            velocity_level = MIN_DYNAMIC_LEVEL + vel_norm * _DYN_RANGE
+        elif volume.velocityScalar is not None:
+            vel_norm = max(0.0, min(1.0, float(volume.velocityScalar)))
+            velocity_level = MIN_DYNAMIC_LEVEL + vel_norm * _DYN_RANGE
+    if velocity_level is not None:
+        level = max(level, velocity_level)
+
+    return _clamp_dynamic_level(level)
+
+
+def _split_events_by_pitch_overlap(note_events: NoteEventArray) -> NoteEventArray:
     """
     Split note events whenever the number of active notes on the same pitch changes,
     so overlap height only applies to the portion that is truly stacked.
-    """
-    events_by_pitch: Dict[float, List[NoteEvent]] = {}
-    for event in note_events:
-        events_by_pitch.setdefault(event.pitch_midi, []).append(event)
 
-    split_events: List[NoteEvent] = []
-
-    for events in events_by_pitch.values():
-        boundaries = set()
-        for event in events:
-            start = event.start_time
-            end = event.start_time + event.duration
-            boundaries.add(start)
-            boundaries.add(end)
-
-        sorted_boundaries = sorted(boundaries)
-
-        if len(sorted_boundaries) < 2:
-            for event in events:
-                split_events.append(
-                    NoteEvent(
-                        pitch_midi=event.pitch_midi,
-                        start_time=event.start_time,
-                        duration=event.duration,
-                        instrument_family=event.instrument_family,
-                        instrument_label=event.instrument_label,
-                        dynamic_level=event.dynamic_level,
-                        dynamic_mark=event.dynamic_mark,
-                        pitch_overlap=len(events),
-                        original_duration=event.original_duration,
-                        voice_id=event.voice_id,
-                    )
-                )
-            continue
+    This is one sweep line over every pitch at once: note starts and ends become
+    boundaries sorted by (pitch, time), each event covers the boundary segments between
+    its start and end index, and a difference array gives the active count of every
+    segment. Each event's start and end carry its own pitch, so a span never crosses
+    into another pitch's boundaries.
+    """
+    event_count = len(note_events)
+    if event_count == 0:
+        return note_events
 
-        for i in range(len(sorted_boundaries) - 1):
-            segment_start = sorted_boundaries[i]
-            segment_end = sorted_boundaries[i + 1]
-            if segment_end <= segment_start:
-                continue
+    pitches = note_events.pitch_midi
+    starts = note_events.start_time
+    ends = starts + note_events.duration
+
+    # Preserve where each note originally ended relative to its segment so that
+    # clipped_start + clipped_original_duration still lands on the original end
+    original_ends = starts + note_events.original_duration
+
+    # Early out: when every note has positive length and no note starts before the previous
+    # same-pitch note ends, each note is exactly one segment with overlap 1.
+    by_pitch = np.lexsort((starts, pitches))
+    same_pitch = pitches[by_pitch][1:] == pitches[by_pitch][:-1]
+    overlapping = same_pitch & (ends[by_pitch][:-1] > starts[by_pitch][1:])
+    if (ends > starts).all() and not overlapping.any():
+        source_rows = np.arange(event_count)
+        split_events = note_events.take(source_rows)
+        split_events.duration = ends - starts
+        split_events.pitch_overlap = np.ones(event_count, dtype=np.int64)
+        split_events.original_duration = np.maximum(0.0, original_ends - starts)
+    else:
+        # Deduplicated (pitch, time) boundaries, and the boundary index of every start and end
+        point_pitch = np.concatenate((pitches, pitches))
+        point_time = np.concatenate((starts, ends))
+        point_order = np.lexsort((point_time, point_pitch))
+        sorted_pitch = point_pitch[point_order]
+        sorted_time = point_time[point_order]
+        is_new = np.ones(2 * event_count, dtype=bool)
+        is_new[1:] = (sorted_pitch[1:] != sorted_pitch[:-1]) | (sorted_time[1:] != sorted_time[:-1])
+        boundary_time = sorted_time[is_new]
+        boundary_pitch = sorted_pitch[is_new]
+        point_boundary = np.empty(2 * event_count, dtype=np.int64)
+        point_boundary[point_order] = np.cumsum(is_new) - 1
+        start_idx = point_boundary[:event_count]
+        end_idx = point_boundary[event_count:]
+
+        # A pitch whose notes all start and end on one instant has no segment; its events pass
+        # through with the pitch's event count as overlap.
+        is_new_pitch = np.ones(len(boundary_pitch), dtype=bool)
+        is_new_pitch[1:] = boundary_pitch[1:] != boundary_pitch[:-1]
+        boundary_group = np.cumsum(is_new_pitch) - 1
+        event_group = boundary_group[start_idx]
+        degenerate = np.bincount(boundary_group)[event_group] == 1
+        degenerate_rows = np.flatnonzero(degenerate)
+        group_sizes = np.bincount(event_group)
+
+        # Segment k spans boundary_time[k]..boundary_time[k + 1]; an event is active in
+        # segments start_idx..end_idx - 1 (none when its duration is not positive).
+        spans = np.maximum(end_idx - start_idx, 0)
+        # Active counts per segment: +1 where a note starts, -1 where it ends, then a running
+        # sum. bincount does the scatter in one buffered pass (np.add.at is unbuffered).
+        active = spans > 0
+        boundary_count = len(boundary_time)
+        delta = np.bincount(start_idx[active], minlength=boundary_count) - np.bincount(
+            end_idx[active], minlength=boundary_count
+        )
+        active_counts = np.cumsum(delta)
+
+        # Expand to one (segment, event) row per covered segment, ordered by segment and
+        # then by original event order.
+        event_ids = np.repeat(np.arange(event_count), spans)
+        segment_ids = np.repeat(start_idx - np.cumsum(spans) + spans, spans) + np.arange(len(event_ids))
+        order = np.argsort(segment_ids, kind="stable")
+        event_ids = event_ids[order]
+        segment_ids = segment_ids[order]
+        segment_starts = boundary_time[segment_ids]
+
+        source_rows = np.concatenate((event_ids, degenerate_rows))
+        split_events = note_events.take(source_rows)
+        split_events.start_time = np.concatenate((segment_starts, starts[degenerate_rows]))
+        split_events.duration = np.concatenate(
+            (boundary_time[segment_ids + 1] - segment_starts, note_events.duration[degenerate_rows])
+        )
+        split_events.pitch_overlap = np.concatenate(
+            (active_counts[segment_ids], group_sizes[event_group[degenerate_rows]])
+        )
+        split_events.original_duration = np.concatenate(
+            (
+                np.maximum(0.0, original_ends[event_ids] - segment_starts),
+                note_events.original_duration[degenerate_rows],
+            )
+        )
 
-            active_events = [
-                event
-                for event in events
-                if event.start_time < segment_end and (event.start_time + event.duration) > segment_start
-            ]
-            if not active_events:
-                continue
+    # Order by (start_time, pitch_midi, instrument_label), ties kept in emission order.
+    # Labels are ranked through their few distinct values rather than an object-array sort.
+    label_rank = _label_sort_ranks(note_events)[source_rows]
+    order = np.lexsort(
+        (np.arange(len(split_events)), label_rank, split_events.pitch_midi, split_events.start_time)
+    )
+    return split_events.take(order)
 
-            overlap = len(active_events)
-            for event in active_events:
-                clipped_start = max(segment_start, event.start_time)
-                clipped_end = min(segment_end, event.start_time + event.duration)
-                if clipped_end <= clipped_start:
-                    continue
 
-                # Calculate original_duration for the clipped segment
-                # The key insight: we need to preserve where the note originally ended
-                # relative to the segment, not clip it to the visual duration boundaries
-                # For connection detection: clipped_start + clipped_original_duration should 
-                # equal where the note originally ended relative to segment_start
-                original_end_absolute = event.start_time + event.original_duration
-                clipped_original_duration = max(0.0, original_end_absolute - clipped_start)
-
-                split_events.append(
-                    NoteEvent(
-                        pitch_midi=event.pitch_midi,
-                        start_time=clipped_start,
-                        duration=clipped_end - clipped_start,
-                        instrument_family=event.instrument_family,
-                        instrument_label=event.instrument_label,
-                        dynamic_level=event.dynamic_level,
-                        dynamic_mark=event.dynamic_mark,
-                        pitch_overlap=overlap,
-                        original_duration=clipped_original_duration,
-                        voice_id=event.voice_id,
-                    )
-                )
+def _label_sort_ranks(note_events: NoteEventArray) -> np.ndarray:
+    """
+    Rank each row's instrument_label in string sort order.
 
-    split_events.sort(key=lambda e: (e.start_time, e.pitch_midi, e.instrument_label))
+    Interned label ids (set by extract_notes) are mapped through a small id -> rank table;
+    rows without ids fall back to ranking the label strings.
+    """
+    label_ids = note_events.instrument_label_id
+    if len(label_ids) and label_ids.min() >= 0:
+        distinct_ids, first_rows = np.unique(label_ids, return_index=True)
+        distinct_labels = note_events.instrument_label[first_rows].tolist()
+        rank_table = np.zeros(distinct_ids[-1] + 1, dtype=np.int64)
+        for rank, position in enumerate(sorted(range(len(distinct_labels)), key=distinct_labels.__getitem__)):
+            rank_table[distinct_ids[position]] = rank
+        return rank_table[label_ids]
 
-    return split_events
+    labels = note_events.instrument_label.tolist()
+    rank_of = {label: rank for rank, label in enumerate(sorted(set(labels)))}
+    return np.fromiter((rank_of[label] for label in labels), dtype=np.int64, count=len(labels))
 
 
 def _assign_pitch_overlap_unsplit(note_events: List[NoteEvent]) -> List[NoteEvent]:
@@ -190,20 +336,20 @@ def _assign_pitch_overlap_unsplit(note_events: List[NoteEvent]) -> List[NoteEven
 
     for events in events_by_pitch.values():
         events.sort(key=lambda item: (item[1].start_time, item[0]))
-        active: List[tuple[int, float]] = []
+        # Min-heap of (end_time, idx) for notes still sounding; starts only move forward,
+        # so anything ending at or before the current start can be dropped for good.
+        active: List[tuple[float, int]] = []
         for idx, event in events:
             current_start = event.start_time
             current_end = event.start_time + event.duration
-            active = [(i, end) for i, end in active if end > current_start]
+            while active and active[0][0] <= current_start:
+                heapq.heappop(active)
             current_overlap = len(active) + 1
             overlap_counts[idx] = max(overlap_counts[idx], current_overlap)
 
-            updated_active: List[tuple[int, float]] = []
-            for active_idx, end_time in active:
+            for _, active_idx in active:
                 overlap_counts[active_idx] = max(overlap_counts[active_idx], current_overlap)
-                updated_active.append((active_idx, end_time))
-            updated_active.append((idx, current_end))
-            active = updated_active
+            heapq.heappush(active, (current_end, idx))
 
     for idx, event in enumerate(note_events):
         event.pitch_overlap = overlap_counts[idx]
@@ -211,52 +357,40 @@ def _assign_pitch_overlap_unsplit(note_events: List[NoteEvent]) -> List[NoteEven
     return note_events
 
 
-def _clip_to_window(note_events: List[NoteEvent], window_start: float, window_end: float) -> List[NoteEvent]:
+def _clip_to_window(note_events: NoteEventArray, window_start: float, window_end: float) -> NoteEventArray:
     """
     Clip note events to a time window and re-base start times to window_start.
     """
     if window_start is None or window_end is None:
         return note_events
 
-    clipped: List[NoteEvent] = []
-    for event in note_events:
-        ev_start = event.start_time
-        ev_end = event.start_time + event.duration
-        if ev_end <= window_start or ev_start >= window_end:
-            continue
+    ev_start = note_events.start_time
+    ev_end = ev_start + note_events.duration
+    original_end = ev_start + note_events.original_duration
+
+    # Calculate original_duration for the clipped segment
+    # We need to preserve where the note originally ended for connection detection
+    # The key: clipped_start + clipped_original_duration should equal original_end - window_start
+    if window_start == 0:
+        # Windows from the top of the score need no re-basing (x - 0.0 == x)
+        new_start = np.maximum(ev_start, 0.0)
+        new_end = np.minimum(ev_end, window_end)
+        original_end_relative = original_end
+        keep = (ev_end > 0.0) & (ev_start < window_end)
+    else:
+        new_start = np.maximum(ev_start, window_start) - window_start
+        new_end = np.minimum(ev_end, window_end) - window_start
+        original_end_relative = original_end - window_start
+        keep = (ev_end > window_start) & (ev_start < window_end)
 
-        new_start = max(ev_start, window_start) - window_start
-        new_end = min(ev_end, window_end) - window_start
-        duration = new_end - new_start
-        if duration <= 0:
-            continue
+    duration = new_end - new_start
+    keep &= duration > 0
+    clipped_original_duration = np.maximum(0.0, original_end_relative - new_start)
 
-        # Calculate original_duration for the clipped segment
-        # We need to preserve where the note originally ended for connection detection
-        # The key: clipped_start + clipped_original_duration should equal original_end - window_start
-        original_start = event.start_time
-        original_end = event.start_time + event.original_duration
-        
-        # Calculate where the note originally ended relative to the window start
-        original_end_relative = original_end - window_start
-        
-        # clipped_original_duration should make clipped_start + clipped_original_duration = original_end_relative
-        clipped_original_duration = max(0.0, original_end_relative - new_start)
-
-        clipped.append(
-            NoteEvent(
-                pitch_midi=event.pitch_midi,
-                start_time=new_start,
-                duration=duration,
-                instrument_family=event.instrument_family,
-                instrument_label=event.instrument_label,
-                dynamic_level=event.dynamic_level,
-                dynamic_mark=event.dynamic_mark,
-                pitch_overlap=event.pitch_overlap,
-                original_duration=clipped_original_duration,
-                voice_id=event.voice_id,
-            )
-        )
+    clipped = note_events.take(keep)
+    clipped.start_time = new_start[keep]
+    clipped.duration = duration[keep]
+    clipped.original_duration = clipped_original_duration[keep]
     return clipped
 
 
@@ -271,14 +405,21 @@ def extract_rehearsal_marks(
         return []
 
     measure_offsets = measure_offsets or _build_measure_offset_map(score)[0]
+    offset_table = _build_measure_offset_table(measure_offsets)
     part = score.parts[0]
     rehearsal_marks: List[RehearsalMark] = []
+    rehearsal_mark_cls = expressions.RehearsalMark
 
-    for mark in part.recurse().getElementsByClass(expressions.RehearsalMark):
+    for mark, measure_offset, _ in _walk_part(part, measure_offsets, offset_table):
+        if not isinstance(mark, rehearsal_mark_cls):
+            continue
         label = str(mark.content).strip() if getattr(mark, "content", None) else str(mark).strip()
         if not label:
             continue
-        start_time = _absolute_offset_from_measure(mark, score, measure_offsets)
+        if measure_offset is not None:
+            start_time = measure_offset + float(mark.offset)
+        else:
+            start_time = _absolute_offset_from_measure(mark, score, measure_offsets, offset_table)
         rehearsal_marks.append(RehearsalMark(label=label, start_time=start_time))
 
     return rehearsal_marks
@@ -299,9 +440,24 @@ def extract_notes(
     measure_offsets, _ = (
         _build_measure_offset_map(score) if measure_offsets is None else (measure_offsets, None)
     )
+    offset_table = _build_measure_offset_table(measure_offsets)
 
-    note_events = []
+    raw_events: List[tuple] = []
     instrument_label_counts = {}
+    label_ids: Dict[str, int] = {}
+
+    # music21's stream import already loads every submodule used here, so deferring the
+    # imports buys nothing; bind the classes and lookups used per element to locals instead.
+    note_cls = note.Note
+    chord_cls = chord.Chord
+    voice_cls = stream.Voice
+    not_rest_cls = note.NotRest
+    instrument_cls = instrument.Instrument
+    dynamic_cls = dynamics.Dynamic
+    staccato_cls = articulations.Staccato
+    tie_code_for = _TIE_CODES.get
+    dyn_level_for = _DYN_LOOKUP.get
+    apply_velocity = _apply_velocity
 
     for part_index, part in enumerate(score.parts, start=1):
         part_instrument = None
@@ -310,15 +466,26 @@ def extract_notes(
         instrument_label = None
         part_transposition = None
 
-        for element in part.recurse().getElementsByClass(instrument.Instrument):
-            part_instrument = element
-            if hasattr(element, "midiProgram") and element.midiProgram is not None:
-                midi_program = element.midiProgram
-            if hasattr(element, "instrumentName") and element.instrumentName:
-                instrument_name = str(element.instrumentName)
-            if getattr(element, "transposition", None) is not None:
-                part_transposition = element.transposition
-            break
+        # Walk the part tree once, measure by measure, dispatching instruments, notes and
+        # dynamics by class in the same pass. flatten() is not used: it re-sites elements onto
+        # the flat stream, so .offset would become part-absolute instead of measure-relative.
+        note_elements = []
+        dynamic_elements = []
+        for element, measure_offset, voiced in _walk_part(part, measure_offsets, offset_table):
+            if isinstance(element, not_rest_cls):
+                note_elements.append((element, measure_offset, voiced))
+            elif isinstance(element, dynamic_cls):
+                dynamic_elements.append((element, measure_offset))
+            elif part_instrument is None and isinstance(element, instrument_cls):
+                part_instrument = element
+
+        if part_instrument is not None:
+            if hasattr(part_instrument, "midiProgram") and part_instrument.midiProgram is not None:
+                midi_program = part_instrument.midiProgram
+            if hasattr(part_instrument, "instrumentName") and part_instrument.instrumentName:
+                instrument_name = str(part_instrument.instrumentName)
+            if getattr(part_instrument, "transposition", None) is not None:
+                part_transposition = part_instrument.transposition
 
         if part_instrument is None and part.partName:
             instrument_name = str(part.partName)
@@ -340,185 +507,130 @@ def extract_notes(
             )
             instrument_label = base_label
 
-        note_data = []
-
         def _sounding_midi(pitch_obj):
-            if pitch_obj.midi is None:
+            midi = pitch_obj.midi
+            if midi is None:
                 return None
             if part_transposition is None:
-                return float(pitch_obj.midi)
+                return float(midi)
             try:
-                transposed = pitch_obj.transpose(part_transposition)
-                return float(transposed.midi) if transposed.midi is not None else None
+                transposed_midi = pitch_obj.transpose(part_transposition).midi
+                return float(transposed_midi) if transposed_midi is not None else None
             except Exception:
-                return float(pitch_obj.midi)
-
-        for element in part.recurse().notes:
-            absolute_offset = _absolute_offset_from_measure(element, score, measure_offsets)
-            voice_ctx = element.getContextByClass(stream.Voice)
-            voice_id = str(voice_ctx.id) if voice_ctx is not None and voice_ctx.id is not None else None
-
-            if isinstance(element, note.Note):
-                pitch_obj = element.pitch
-                midi_val = _sounding_midi(pitch_obj)
-                if midi_val is not None:
-                    original_duration = float(element.quarterLength)
-                    is_staccato = any(isinstance(art, articulations.Staccato) for art in element.articulations)
-                    effective_duration = original_duration * (staccato_factor if is_staccato else 1.0)
-                    tie_type = element.tie.type if element.tie is not None else None
-                    note_data.append(
-                        (
-                            midi_val,
-                            absolute_offset,
-                            effective_duration,
-                            original_duration,
-                            tie_type,
-                            element,
-                            voice_id,
-                        )
-                    )
-            elif isinstance(element, chord.Chord):
-                for pitch_obj in element.pitches:
-                    midi_val = _sounding_midi(pitch_obj)
-                    if midi_val is not None:
-                        original_duration = float(element.quarterLength)
-                        is_staccato = any(isinstance(art, articulations.Staccato) for art in element.articulations)
-                        effective_duration = original_duration * (staccato_factor if is_staccato else 1.0)
-                        tie_type = element.tie.type if element.tie is not None else None
-                        note_data.append(
-                            (
-                                midi_val,
-                                absolute_offset,
-                                effective_duration,
-                                original_duration,
-                                tie_type,
-                                element,
-                                voice_id,
-                            )
-                        )
-            elif isinstance(element, note.Rest):
-                continue
-
-        processed_indices = set()
+                return float(midi)
 
         dynamic_timeline = []
-        for dyn in part.recurse().getElementsByClass(dynamics.Dynamic):
-            dyn_offset = _absolute_offset_from_measure(dyn, score, measure_offsets)
-            dyn_mark = None
-            if hasattr(dyn, "value") and dyn.value is not None:
-                dyn_mark = str(dyn.value).lower()
-            level = DYNAMIC_MARK_LEVELS.get(dyn_mark, DEFAULT_DYNAMIC_LEVEL)
+        for dyn, measure_offset in dynamic_elements:
+            if measure_offset is not None:
+                dyn_offset = measure_offset + float(dyn.offset)
+            else:
+                dyn_offset = _absolute_offset_from_measure(dyn, score, measure_offsets, offset_table)
+            raw_mark = dyn.value
+            dyn_mark = str(raw_mark).lower() if raw_mark is not None else None
+            level = dyn_level_for(dyn_mark, DEFAULT_DYNAMIC_LEVEL)
             dynamic_timeline.append((dyn_offset, level, dyn_mark))
         dynamic_timeline.sort(key=lambda item: item[0])
+        dyn_offsets = [item[0] for item in dynamic_timeline]
+
+        instrument_label_id = label_ids.setdefault(instrument_label, len(label_ids))
+
+        # Notes are emitted as they are walked. A tie start is emitted right away and
+        # remembered per pitch; the next same-pitch stop at or after it folds its durations
+        # into that row instead of being emitted. A newer start on the same pitch replaces
+        # the older one (which stays as emitted), and stops with no open start stand alone.
+        open_starts: Dict[float, Tuple[int, float]] = {}
 
-        def get_dynamic_at(offset: float, element) -> tuple[float, Optional[str]]:
-            level = None
-            mark = None
-            for dyn_offset, dyn_level, dyn_mark in reversed(dynamic_timeline):
-                if dyn_offset <= offset:
-                    level = dyn_level
-                    mark = dyn_mark
-                    break
-            if level is None:
-                level = DEFAULT_DYNAMIC_LEVEL
-
-            velocity_level = None
-            volume = getattr(element, "volume", None)
-            if volume:
-                if volume.velocity is not None:
-                    vel_norm = max(0.0, min(1.0, volume.velocity / 127.0))
-                    velocity_level = MIN_DYNAMIC_LEVEL + vel_norm * (MAX_DYNAMIC_LEVEL - MIN_DYNAMIC_LEVEL)
-                elif volume.velocityScalar is not None:
-                    vel_norm = max(0.0, min(1.0, float(volume.velocityScalar)))
-                    velocity_level = MIN_DYNAMIC_LEVEL + vel_norm * (MAX_DYNAMIC_LEVEL - MIN_DYNAMIC_LEVEL)
-            if velocity_level is not None:
-                level = max(level, velocity_level)
-
-            return _clamp_dynamic_level(level), mark
-
-        for i, (pitch_midi, offset, duration, original_duration, tie_type, element, voice_id) in enumerate(note_data):
-            if i in processed_indices:
+        for element, measure_offset, voiced in note_elements:
+            if isinstance(element, note_cls):
+                pitch_objs = (element.pitch,)
+            elif isinstance(element, chord_cls):
+                pitch_objs = element.pitches
+            else:
                 continue
 
-            if tie_type == "start":
-                total_duration = duration
-                total_original_duration = original_duration
-                dynamic_level, dynamic_mark = get_dynamic_at(offset, element)
-
-                for j, (
-                    other_pitch,
-                    other_offset,
-                    other_duration,
-                    other_original_duration,
-                    other_tie_type,
-                    _,
-                    other_voice_id,
-                ) in enumerate(note_data[i + 1 :], start=i + 1):
-                    if j in processed_indices:
-                        continue
+            if measure_offset is not None:
+                absolute_offset = measure_offset + float(element.offset)
+            else:
+                absolute_offset = _absolute_offset_from_measure(element, score, measure_offsets, offset_table)
+            active_site = element.activeSite
+            if isinstance(active_site, voice_cls):
+                voice_ctx = active_site
+            elif voiced:
+                voice_ctx = element.getContextByClass(voice_cls)
+            else:
+                voice_ctx = None
+            voice_id = str(voice_ctx.id) if voice_ctx is not None and voice_ctx.id is not None else None
 
-                    if (other_pitch == pitch_midi and other_tie_type == "stop" and other_offset >= offset):
-                        total_duration += other_duration
-                        total_original_duration += other_original_duration
-                        processed_indices.add(j)
-                        break
-                    elif other_pitch == pitch_midi and other_tie_type == "start":
-                        break
+            # Duration, staccato and tie belong to the element, so a chord resolves them once
+            original_duration = float(element.quarterLength)
+            # Most notes carry no articulations; skip building the any() generator for them
+            element_articulations = element.articulations
+            is_staccato = bool(element_articulations) and any(
+                isinstance(art, staccato_cls) for art in element_articulations
+            )
+            effective_duration = original_duration * (staccato_factor if is_staccato else 1.0)
+            tie = element.tie
+            tie_code = tie_code_for(tie.type, _TIE_NONE) if tie is not None else _TIE_NONE
 
-                note_events.append(
-                    NoteEvent(
-                        pitch_midi=pitch_midi,
-                        start_time=offset,
-                        duration=total_duration,
-                        instrument_family=instrument_family,
-                        instrument_label=instrument_label,
-                        dynamic_level=dynamic_level,
-                        dynamic_mark=dynamic_mark,
-                        original_duration=total_original_duration,
-                        voice_id=voice_id,
-                    )
-                )
-                processed_indices.add(i)
-            elif tie_type == "stop":
-                if i not in processed_indices:
-                    dynamic_level, dynamic_mark = get_dynamic_at(offset, element)
-                    note_events.append(
-                        NoteEvent(
-                            pitch_midi=pitch_midi,
-                            start_time=offset,
-                            duration=duration,
-                            instrument_family=instrument_family,
-                            instrument_label=instrument_label,
-                            dynamic_level=dynamic_level,
-                            dynamic_mark=dynamic_mark,
-                            original_duration=original_duration,
-                            voice_id=voice_id,
+            # The active marking is the last one at or before the note; resolved on first use
+            element_dynamic = None
+
+            for pitch_obj in pitch_objs:
+                midi_val = _sounding_midi(pitch_obj)
+                if midi_val is None:
+                    continue
+
+                if tie_code == _TIE_STOP:
+                    open_start = open_starts.get(midi_val)
+                    if open_start is not None and absolute_offset >= open_start[1]:
+                        del open_starts[midi_val]
+                        row_idx = open_start[0]
+                        row = raw_events[row_idx]
+                        raw_events[row_idx] = (
+                            row[:2]
+                            + (row[2] + effective_duration,)
+                            + row[3:8]
+                            + (row[8] + original_duration,)
+                            + row[9:]
                         )
-                    )
-                    processed_indices.add(i)
-            else:
-                dynamic_level, dynamic_mark = get_dynamic_at(offset, element)
-                note_events.append(
-                    NoteEvent(
-                        pitch_midi=pitch_midi,
-                        start_time=offset,
-                        duration=duration,
-                        instrument_family=instrument_family,
-                        instrument_label=instrument_label,
-                        dynamic_level=dynamic_level,
-                        dynamic_mark=dynamic_mark,
-                        original_duration=original_duration,
-                        voice_id=voice_id,
+                        continue
+
+                if element_dynamic is None:
+                    dyn_idx = bisect_right(dyn_offsets, absolute_offset) - 1
+                    if dyn_idx >= 0:
+                        _, dyn_level, dyn_mark = dynamic_timeline[dyn_idx]
+                    else:
+                        dyn_level, dyn_mark = DEFAULT_DYNAMIC_LEVEL, None
+                    element_dynamic = (apply_velocity(dyn_level, element), dyn_mark)
+
+                if tie_code == _TIE_START:
+                    open_starts[midi_val] = (len(raw_events), absolute_offset)
+
+                # Field order matches NoteEvent.__init__; pitch_overlap is assigned after extraction
+                raw_events.append(
+                    (
+                        midi_val,
+                        absolute_offset,
+                        effective_duration,
+                        instrument_family,
+                        instrument_label,
+                        element_dynamic[0],
+                        element_dynamic[1],
+                        1,
+                        original_duration,
+                        voice_id,
+                        instrument_label_id,
                     )
                 )
-                processed_indices.add(i)
+
+    note_events = NoteEventArray.from_rows(raw_events)
 
     if slice_window is not None:
         note_events = _clip_to_window(note_events, slice_window[0], slice_window[1])
 
     if split_overlaps:
-        return _split_events_by_pitch_overlap(note_events)
-    return _assign_pitch_overlap_unsplit(note_events)
+        return _split_events_by_pitch_overlap(note_events).to_events()
+    return _assign_pitch_overlap_unsplit(note_events.to_events())
 
 
 def detect_note_connections(note_events: List[NoteEvent]) -> List[Tuple[int, int]]:
@@ -630,37 +742,45 @@ def detect_note_connections(note_events: List[NoteEvent]) -> List[Tuple[int, int
                 key=lambda item: (item[1].start_time, item[1].pitch_midi),
             )
 
-            for i in range(len(deduped_notes) - 1):
-                idx1, note1 = deduped_notes[i]
-                
-                # Check all subsequent notes to find the one that starts exactly where this one ends
-                # (handles cases where multiple notes might start at the same time)
+            # Bucket notes by start time on the EPS grid: a start within EPS of note1's end can
+            # only sit in the end's bucket or a neighbouring one. Buckets hold positions in
+            # deduped order, so candidates are visited in the same order as a forward scan.
+            start_buckets: Dict[int, List[int]] = {}
+            for pos, (_, ev) in enumerate(deduped_notes):
+                start_buckets.setdefault(math.floor(ev.start_time / CONNECTION_TIME_EPS), []).append(pos)
+
+            for i, (idx1, note1) in enumerate(deduped_notes):
                 note1_end = note1.start_time + note1.original_duration
-                
-                for j in range(i + 1, len(deduped_notes)):
+                end_key = math.floor(note1_end / CONNECTION_TIME_EPS)
+                candidates = sorted(
+                    pos
+                    for key in (end_key - 1, end_key, end_key + 1)
+                    for pos in start_buckets.get(key, ())
+                    if pos > i
+                )
+
+                for j in candidates:
                     idx2, note2 = deduped_notes[j]
                     note2_start = note2.start_time
-                    
-                    # If note2 starts after note1 ends, no need to check further (sorted by start_time)
-                    if note2_start > note1_end + CONNECTION_TIME_EPS:
-                        break
-                    
+
+                    # Check if notes are adjacent (no rest between)
+                    # Use small epsilon for floating point comparison
+                    if not abs(note1_end - note2_start) < CONNECTION_TIME_EPS:
+                        continue
+
                     # Allow same-pitch connections only for visibly separated, shortened notes
                     if note1.pitch_midi == note2.pitch_midi:
                         visible_gap = (note2.start_time - (note1.start_time + note1.duration))
                         shortened = (note1.duration + CONNECTION_TIME_EPS) < note1.original_duration
                         if not (shortened and visible_gap > CONNECTION_TIME_EPS):
                             continue
-                    
-                    # Check if notes are adjacent (no rest between)
-                    # Use small epsilon for floating point comparison
-                    if abs(note1_end - note2_start) < CONNECTION_TIME_EPS:
-                        target_key = round(note2_start / CONNECTION_TIME_EPS) * CONNECTION_TIME_EPS
-                        if target_key in connected_target_starts:
-                            break  # already connected to a note starting here; avoid duplicate lines
-                        connected_target_starts.add(target_key)
-                        connections.append((idx1, idx2))
-                        break  # Only connect to the first note that starts at this position
+
+                    target_key = round(note2_start / CONNECTION_TIME_EPS) * CONNECTION_TIME_EPS
+                    if target_key in connected_target_starts:
+                        break  # already connected to a note starting here; avoid duplicate lines
+                    connected_target_starts.add(target_key)
+                    connections.append((idx1, idx2))
+                    break  # Only connect to the first note that starts at this position
     
     return connections
 
@@ -1,6 +1,9 @@
 """Instrument family classification and color mapping."""
 
-from typing import Optional
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
 
 # Ensemble types
 ENSEMBLE_UNGROUPED = "ungrouped"
@@ -41,12 +44,13 @@ BIGBAND_COLORS = {
 
 # Individual instrument color palette (cycled for more than 20 instruments)
 # Based on Matplotlib's tab20 palette for good contrast
-INDIVIDUAL_COLOR_PALETTE = [
+INDIVIDUAL_COLOR_PALETTE = (
     "#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
     "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf",
     "#393b79", "#637939", "#8c6d31", "#843c39", "#7b4173",
     "#5254a3", "#9c9ede", "#ad494a", "#d6616b", "#e7ba52",
-]
+)
+_PALETTE_LEN = len(INDIVIDUAL_COLOR_PALETTE)
 
 # Orchestra MIDI program mapping
 ORCHESTRA_MIDI_MAPPING = {
@@ -374,6 +378,10 @@ BIGBAND_MIDI_MAPPING = {
     128: BIGBAND_UNKNOWN,  # Gunshot
 }
 
+# Dense lookup tables indexed directly by MIDI program; slot 0 is never reached past the range guard
+_ORCHESTRA_MIDI_TABLE = (ORCHESTRA_UNKNOWN,) + tuple(ORCHESTRA_MIDI_MAPPING[program] for program in range(1, 129))
+_BIGBAND_MIDI_TABLE = (BIGBAND_UNKNOWN,) + tuple(BIGBAND_MIDI_MAPPING[program] for program in range(1, 129))
+
 # Orchestra instrument name keywords
 ORCHESTRA_NAME_KEYWORDS = {
     ORCHESTRA_STRINGS: [
@@ -385,7 +393,7 @@ ORCHESTRA_NAME_KEYWORDS = {
     ORCHESTRA_WINDS: [
         "flute", "piccolo", "recorder", "oboe", "english horn", "cor anglais",
         "clarinet", "bassoon", "contrabassoon", "saxophone", "sax", "soprano",
-        "alto", "tenor", "baritone", "bass clarinet", "bassoon", "fagotto",
+        "alto", "tenor", "baritone", "bass clarinet", "fagotto",
         "organ", "accordion", "harmonica", "pan flute", "whistle", "ocarina",
         "shakuhachi", "bagpipe", "fiddle",
     ],
@@ -424,6 +432,100 @@ BIGBAND_NAME_KEYWORDS = {
 }
 
 
+def _sort_keywords_longest_first(name_keywords):
+    """
+    Flatten a family -> keywords mapping into (keyword, family) pairs, longest keyword first.
+    
+    More specific keywords (e.g., "bassoon") must be checked before generic ones (e.g., "bass")
+    across all families; the sort is stable, so equal-length keywords keep declaration order.
+    A keyword repeated later in the mapping can never match first, so only its first
+    occurrence is kept.
+    """
+    pairs = {}
+    for family, keywords in name_keywords.items():
+        for keyword in keywords:
+            pairs.setdefault(keyword, family)
+    return tuple(sorted(pairs.items(), key=lambda pair: len(pair[0]), reverse=True))
+
+
+# Keyword scan order per ensemble, computed once at import
+_ORCHESTRA_SORTED_KEYWORDS = _sort_keywords_longest_first(ORCHESTRA_NAME_KEYWORDS)
+_BIGBAND_SORTED_KEYWORDS = _sort_keywords_longest_first(BIGBAND_NAME_KEYWORDS)
+
+# Per-ensemble lookup data as
+# (midi_table, sorted_keywords, keyword_families, unknown_family, colors, unknown_color);
+# any ensemble other than bigband falls back to orchestra
+_ORCHESTRA_CFG = (
+    _ORCHESTRA_MIDI_TABLE,
+    _ORCHESTRA_SORTED_KEYWORDS,
+    dict(_ORCHESTRA_SORTED_KEYWORDS),
+    ORCHESTRA_UNKNOWN,
+    ORCHESTRA_COLORS,
+    ORCHESTRA_COLORS[ORCHESTRA_UNKNOWN],
+)
+_BIGBAND_CFG = (
+    _BIGBAND_MIDI_TABLE,
+    _BIGBAND_SORTED_KEYWORDS,
+    dict(_BIGBAND_SORTED_KEYWORDS),
+    BIGBAND_UNKNOWN,
+    BIGBAND_COLORS,
+    BIGBAND_COLORS[BIGBAND_UNKNOWN],
+)
+_ENSEMBLE_CONFIG = {
+    ENSEMBLE_ORCHESTRA: _ORCHESTRA_CFG,
+    ENSEMBLE_BIGBAND: _BIGBAND_CFG,
+}
+
+# Object-array views of the MIDI tables for batch classification with a single fancy index
+_ORCHESTRA_MIDI_ARRAY = np.array(_ORCHESTRA_MIDI_TABLE, dtype=object)
+_BIGBAND_MIDI_ARRAY = np.array(_BIGBAND_MIDI_TABLE, dtype=object)
+_MIDI_ARRAYS = {
+    ENSEMBLE_ORCHESTRA: _ORCHESTRA_MIDI_ARRAY,
+    ENSEMBLE_BIGBAND: _BIGBAND_MIDI_ARRAY,
+}
+
+
+def _lower_name(instrument_name: Optional[str]) -> Optional[str]:
+    """Lowercase an instrument name for keyword matching, reusing it when already lowercase."""
+    if not instrument_name:
+        return None
+    return instrument_name if instrument_name.islower() else instrument_name.lower()
+
+
+def _classify_family(
+    midi_program: Optional[int],
+    name_lower: Optional[str],
+    ensemble: str,
+    *,
+    _config_for=_ENSEMBLE_CONFIG.get,
+    _default_cfg=_ORCHESTRA_CFG,
+) -> str:
+    """
+    Classify a pre-normalized (MIDI program, lowercase name) pair for one ensemble.
+    
+    The keyword-only defaults bind the dispatch table at definition time so the lookup
+    avoids global name resolution; callers never pass them.
+    """
+    midi_table, sorted_keywords, keyword_families, unknown_family, _, _ = _config_for(ensemble, _default_cfg)
+    
+    # First, try MIDI program number
+    if midi_program is not None and 1 <= midi_program <= 128:
+        return midi_table[midi_program]
+    
+    # Fall back to instrument name matching, longest keyword first
+    if name_lower:
+        # A name that is exactly a keyword is its own longest match, so skip the scan
+        family = keyword_families.get(name_lower)
+        if family is not None:
+            return family
+        for keyword, family in sorted_keywords:
+            if keyword in name_lower:
+                return family
+    
+    return unknown_family
+
+
+@lru_cache(maxsize=2048)
 def get_instrument_family(
     midi_program: Optional[int] = None,
     instrument_name: Optional[str] = None,
@@ -440,41 +542,74 @@ def get_instrument_family(
     Returns:
         Instrument family string based on the ensemble type
     """
-    # Select the appropriate mapping based on ensemble type
-    if ensemble == ENSEMBLE_BIGBAND:
-        midi_mapping = BIGBAND_MIDI_MAPPING
-        name_keywords = BIGBAND_NAME_KEYWORDS
-        unknown_family = BIGBAND_UNKNOWN
-    else:  # Default to orchestra
-        midi_mapping = ORCHESTRA_MIDI_MAPPING
-        name_keywords = ORCHESTRA_NAME_KEYWORDS
-        unknown_family = ORCHESTRA_UNKNOWN
+    name_lower = _lower_name(instrument_name)
+    return _classify_family(midi_program, name_lower, ensemble)
+
+
+def get_instrument_families(
+    midi_program: Optional[int] = None,
+    instrument_name: Optional[str] = None,
+    ensembles: Tuple[str, ...] = (ENSEMBLE_ORCHESTRA, ENSEMBLE_BIGBAND),
+) -> Tuple[str, ...]:
+    """
+    Determine instrument families for several ensembles in one call.
     
-    # First, try MIDI program number
-    if midi_program is not None and 1 <= midi_program <= 128:
-        return midi_mapping.get(midi_program, unknown_family)
-    
-    # Fall back to instrument name matching
-    if instrument_name:
-        name_lower = instrument_name.lower()
-        # Collect all (keyword, family) pairs and sort by keyword length (longest first)
-        # This ensures more specific keywords (e.g., "bassoon") match before generic ones (e.g., "bass")
-        # across all families, preventing "bass" from matching "bassoon" before "bassoon" is checked
-        keyword_family_pairs = []
-        for family, keywords in name_keywords.items():
-            for keyword in keywords:
-                keyword_family_pairs.append((keyword, family))
-        
-        # Sort by keyword length (longest first) to prioritize specific matches
-        keyword_family_pairs.sort(key=lambda x: len(x[0]), reverse=True)
-        
-        for keyword, family in keyword_family_pairs:
-            if keyword in name_lower:
-                return family
+    The instrument name is normalized once and shared across every ensemble,
+    which keeps multi-ensemble scoring (e.g., ensemble detection) cheap.
     
-    return unknown_family
+    Args:
+        midi_program: MIDI program number (1-128)
+        instrument_name: Name of the instrument (case-insensitive)
+        ensembles: Ensemble types to classify against, in the desired output order
+    
+    Returns:
+        Tuple of instrument family strings aligned with ``ensembles``
+    """
+    name_lower = _lower_name(instrument_name)
+    return tuple(_classify_family(midi_program, name_lower, ensemble) for ensemble in ensembles)
+
+
+def classify_programs(programs, ensemble: str = ENSEMBLE_ORCHESTRA) -> np.ndarray:
+    """
+    Determine instrument families for many MIDI program numbers at once.
+    
+    Programs outside 1-128 classify as the ensemble's unknown family, matching
+    get_instrument_family.
+    
+    Args:
+        programs: Array-like of integer MIDI program numbers
+        ensemble: Ensemble type (orchestra or bigband), defaults to orchestra
+    
+    Returns:
+        Object array of instrument family strings aligned with ``programs``
+    """
+    table = _MIDI_ARRAYS.get(ensemble, _ORCHESTRA_MIDI_ARRAY)
+    programs = np.asarray(programs, dtype=np.int64)
+    in_range = (programs >= 1) & (programs <= 128)
+    return table[np.where(in_range, programs, 0)]
+
+
+def classify_names(names: Iterable[Optional[str]], ensemble: str = ENSEMBLE_ORCHESTRA) -> np.ndarray:
+    """
+    Determine instrument families for many instrument names.
+    
+    Convenience wrapper that calls the cached scalar ``get_instrument_family``
+    once per name; unlike ``classify_programs`` it is not vectorized.
+    
+    Args:
+        names: Instrument names (case-insensitive); None or empty names classify as unknown
+        ensemble: Ensemble type (orchestra or bigband), defaults to orchestra
+    
+    Returns:
+        Object array of instrument family strings aligned with ``names``
+    """
+    families = [get_instrument_family(None, name, ensemble) for name in names]
+    result = np.empty(len(families), dtype=object)
+    result[:] = families
+    return result
 
 
+@lru_cache(maxsize=2048)
 def get_family_color(family: str, ensemble: str = ENSEMBLE_ORCHESTRA) -> str:
     """
     Get the color for an instrument family based on ensemble type.
@@ -486,14 +621,8 @@ def get_family_color(family: str, ensemble: str = ENSEMBLE_ORCHESTRA) -> str:
     Returns:
         Hex color code string
     """
-    if ensemble == ENSEMBLE_BIGBAND:
-        colors = BIGBAND_COLORS
-        unknown_family = BIGBAND_UNKNOWN
-    else:  # Default to orchestra
-        colors = ORCHESTRA_COLORS
-        unknown_family = ORCHESTRA_UNKNOWN
-    
-    return colors.get(family, colors[unknown_family])
+    _, _, _, _, colors, unknown_color = _ENSEMBLE_CONFIG.get(ensemble, _ORCHESTRA_CFG)
+    return colors.get(family, unknown_color)
 
 
 def get_individual_color(index: int) -> str:
@@ -508,4 +637,4 @@ def get_individual_color(index: int) -> str:
     """
     if index < 0:
         raise ValueError("Color index must be non-negative")
-    return INDIVIDUAL_COLOR_PALETTE[index % len(INDIVIDUAL_COLOR_PALETTE)]
+    return INDIVIDUAL_COLOR_PALETTE[index % _PALETTE_LEN]
@@ -1,6 +1,8 @@
 """Shared data models and helpers for MusicXML to PNG conversion."""
 
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
 
 # Approximated loudness values for common dynamics, clamped to a sane range
 DYNAMIC_MARK_LEVELS: Dict[str, float] = {
@@ -31,6 +33,22 @@ def _clamp_dynamic_level(level: float) -> float:
 class NoteEvent:
     """Represents a note event for visualization."""
 
+    # Scores allocate one instance per note (more after overlap splitting); slots drop the
+    # per-instance __dict__ and make attribute access a fixed offset.
+    __slots__ = (
+        "pitch_midi",
+        "start_time",
+        "duration",
+        "instrument_family",
+        "instrument_label",
+        "dynamic_level",
+        "dynamic_mark",
+        "pitch_overlap",
+        "original_duration",
+        "voice_id",
+        "instrument_label_id",
+    )
+
     def __init__(
         self,
         pitch_midi: float,
@@ -43,6 +61,7 @@ class NoteEvent:
         pitch_overlap: int = 1,
         original_duration: Optional[float] = None,
         voice_id: Optional[str] = None,
+        instrument_label_id: Optional[int] = None,
     ):
         self.pitch_midi = pitch_midi
         self.start_time = start_time
@@ -54,11 +73,111 @@ class NoteEvent:
         self.pitch_overlap = pitch_overlap
         self.original_duration = original_duration if original_duration is not None else duration
         self.voice_id = voice_id
+        # Small int interned per distinct instrument_label by extract_notes (None when unset),
+        # so hot paths can key and sort on an int instead of the label string
+        self.instrument_label_id = instrument_label_id
+
+
+class NoteEventArray:
+    """
+    Struct-of-arrays form of a list of NoteEvents.
+
+    Each NoteEvent field is one column: numeric fields are float64/int64 NumPy arrays and
+    string fields are object arrays, so whole-score passes can run as vector operations.
+    instrument_label_id is int64 with _UNSET_LABEL_ID standing in for None. Convert back
+    with to_events() at public boundaries.
+    """
+
+    __slots__ = NoteEvent.__slots__
+
+    def __init__(
+        self,
+        pitch_midi: Sequence[float],
+        start_time: Sequence[float],
+        duration: Sequence[float],
+        instrument_family: Sequence[str],
+        instrument_label: Sequence[str],
+        dynamic_level: Sequence[float],
+        dynamic_mark: Sequence[Optional[str]],
+        pitch_overlap: Sequence[int],
+        original_duration: Sequence[float],
+        voice_id: Sequence[Optional[str]],
+        instrument_label_id: Sequence[Optional[int]],
+    ):
+        self.pitch_midi = np.asarray(pitch_midi, dtype=np.float64)
+        self.start_time = np.asarray(start_time, dtype=np.float64)
+        self.duration = np.asarray(duration, dtype=np.float64)
+        self.instrument_family = _object_column(instrument_family)
+        self.instrument_label = _object_column(instrument_label)
+        self.dynamic_level = np.asarray(dynamic_level, dtype=np.float64)
+        self.dynamic_mark = _object_column(dynamic_mark)
+        self.pitch_overlap = np.asarray(pitch_overlap, dtype=np.int64)
+        self.original_duration = np.asarray(original_duration, dtype=np.float64)
+        self.voice_id = _object_column(voice_id)
+        self.instrument_label_id = _label_id_column(instrument_label_id)
+
+    @classmethod
+    def from_rows(cls, rows: List[tuple]) -> "NoteEventArray":
+        """
+        Build from tuples in NoteEvent.__init__ field order with every field filled in
+        (no label or original_duration defaulting).
+        """
+        if not rows:
+            return cls(*([] for _ in NoteEvent.__slots__))
+        return cls(*zip(*rows))
+
+    @classmethod
+    def from_events(cls, events: Iterable[NoteEvent]) -> "NoteEventArray":
+        return cls.from_rows(
+            [tuple(getattr(event, field) for field in NoteEvent.__slots__) for event in events]
+        )
+
+    def __len__(self) -> int:
+        return len(self.start_time)
+
+    def __getitem__(self, index: int) -> NoteEvent:
+        values = [getattr(self, field)[index] for field in NoteEvent.__slots__]
+        values = [value.item() if isinstance(value, np.generic) else value for value in values]
+        if values[-1] == _UNSET_LABEL_ID:
+            values[-1] = None
+        return NoteEvent(*values)
+
+    def take(self, indices) -> "NoteEventArray":
+        """Return a new array holding the rows at indices (an index array or boolean mask)."""
+        return NoteEventArray(*(getattr(self, field)[indices] for field in NoteEvent.__slots__))
+
+    def to_events(self) -> List[NoteEvent]:
+        columns = [getattr(self, field).tolist() for field in NoteEvent.__slots__[:-1]]
+        columns.append(
+            [None if label_id == _UNSET_LABEL_ID else label_id for label_id in self.instrument_label_id.tolist()]
+        )
+        return [NoteEvent(*row) for row in zip(*columns)]
+
+
+# Stand-in for a None instrument_label_id in the int64 column
+_UNSET_LABEL_ID = -1
+
+
+def _label_id_column(values: Sequence[Optional[int]]) -> np.ndarray:
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        return values.astype(np.int64, copy=False)
+    return np.fromiter(
+        (_UNSET_LABEL_ID if value is None else value for value in values), dtype=np.int64, count=len(values)
+    )
+
+
+def _object_column(values: Sequence) -> np.ndarray:
+    # np.asarray would turn a list of strings into a fixed-width str array; keep the objects
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
 
 
 class RehearsalMark:
     """Represents a rehearsal letter/number placed on the timeline."""
 
+    __slots__ = ("label", "start_time")
+
     def __init__(self, label: str, start_time: float):
         self.label = label
         self.start_time = start_time
@@ -1,15 +1,21 @@
 """Visualization helpers for MusicXML note events."""
 
+from concurrent.futures import Executor, Future
 from dataclasses import dataclass, replace, field
-from math import hypot
+from functools import lru_cache
+import math
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, List, Optional, Tuple, Union
 
-import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import numpy as np
+from matplotlib.collections import LineCollection, PathCollection, PolyCollection
+from matplotlib.colors import to_rgba_array
+from matplotlib.figure import Figure
 from matplotlib.lines import Line2D
 from matplotlib.path import Path as MplPath
-from matplotlib.patches import PathPatch
 
 from musicxml_to_png.instruments import (
     BIGBAND_RHYTHM_SECTION,
@@ -32,6 +38,7 @@ from musicxml_to_png.models import (
     MAX_DYNAMIC_LEVEL,
     MIN_DYNAMIC_LEVEL,
     NoteEvent,
+    NoteEventArray,
     RehearsalMark,
 )
 
@@ -45,6 +52,32 @@ BASE_FIG_HEIGHT = MIN_FIG_HEIGHT
 PITCH_TO_HEIGHT_SLOPE = 0.15
 STRETCH_MAX_MULTIPLIER = 10.0
 DEFAULT_CONNECTION_ALPHA = 0.6
+MIN_EDGE_BAR_PX = 2.0
+MIN_VISIBLE_BAR_PX = 0.5
+# Figure margins in inches. Tick labels, axis labels and the title use fixed font sizes, so fixed
+# margins fit them at every figure size without a tight_layout measuring pass.
+FIG_MARGIN = 0.15
+LABEL_MARGIN_LEFT = 0.72
+LABEL_MARGIN_RIGHT = 0.2
+LABEL_MARGIN_BOTTOM = 0.62
+TITLE_MARGIN_TOP = 0.42
+
+# Legend order per grouped ensemble: (family order, unknown family)
+_LEGEND_CONFIGS = {
+    ENSEMBLE_BIGBAND: (
+        (BIGBAND_TRUMPETS, BIGBAND_TROMBONES, BIGBAND_SAXOPHONES, BIGBAND_RHYTHM_SECTION),
+        BIGBAND_UNKNOWN,
+    ),
+    ENSEMBLE_ORCHESTRA: (
+        (ORCHESTRA_STRINGS, ORCHESTRA_WINDS, ORCHESTRA_BRASS, ORCHESTRA_PERCUSSION),
+        ORCHESTRA_UNKNOWN,
+    ),
+}
+_FAMILY_DISPLAY_NAMES = {
+    family: family.replace("_", " ").title()
+    for family_order, _ in _LEGEND_CONFIGS.values()
+    for family in family_order
+}
 
 
 @dataclass(frozen=True)
@@ -69,9 +102,15 @@ class ColorContext:
     color_map: dict[str, str]
     legend_labels: list[str]
     families_present: set[str]
+    # Row in palette for each distinct label (family in family mode), in first-seen order
+    labels_to_idx: dict[str, int] = field(default_factory=dict)
+    # RGBA row per distinct label/family, parsed once from the hex colors
+    palette: Optional[np.ndarray] = field(default=None, compare=False)
+    # Per-event RGBA rows aligned with the note events, shared by bars and connections
+    event_colors: Optional[np.ndarray] = field(default=None, compare=False)
 
 
-@dataclass
+@dataclass(frozen=True)
 class ConnectionConfig:
     """Visual controls for connection lines."""
 
@@ -100,28 +139,36 @@ class ConnectionConfig:
         faded = base * (1.0 - t)
         return max(min_a, min(1.0, faded))
 
-    def with_overrides(
+    def alpha_for_lengths(
         self,
-        alpha: Optional[float] = None,
+        lengths,
+        base_alpha=None,
         min_alpha: Optional[float] = None,
-        fade_start: Optional[float] = None,
-        fade_end: Optional[float] = None,
-        max_gap: Optional[float] = None,
-        linewidth: Optional[float] = None,
-        curve_height_factor: Optional[float] = None,
-    ) -> "ConnectionConfig":
-        return ConnectionConfig(
-            alpha=self.alpha if alpha is None else alpha,
-            min_alpha=self.min_alpha if min_alpha is None else min_alpha,
-            fade_start=self.fade_start if fade_start is None else fade_start,
-            fade_end=self.fade_end if fade_end is None else fade_end,
-            max_gap=self.max_gap if max_gap is None else max_gap,
-            linewidth=self.linewidth if linewidth is None else linewidth,
-            curve_height_factor=self.curve_height_factor if curve_height_factor is None else curve_height_factor,
+    ) -> np.ndarray:
+        """
+        Vectorized alpha_for_length over an array of lengths; base_alpha may be a scalar or a per-length array.
+        """
+        lengths = np.asarray(lengths, dtype=float)
+        base = np.broadcast_to(
+            np.asarray(self.alpha if base_alpha is None else base_alpha, dtype=float), lengths.shape
         )
+        min_a = self.min_alpha if min_alpha is None else min_alpha
+        unfaded = np.clip(base, 0.0, 1.0)
+        if self.fade_end <= self.fade_start:
+            return unfaded
+        fade_range = self.fade_end - self.fade_start
+        t = np.clip((lengths - self.fade_start) / fade_range, 0.0, 1.0)
+        faded = np.maximum(min_a, np.minimum(1.0, base * (1.0 - t)))
+        return np.where(lengths <= self.fade_start, unfaded, faded)
 
+    def with_overrides(self, **overrides: Any) -> "ConnectionConfig":
+        """
+        Build a new config overriding only the provided (non-None) values.
+        """
+        return replace(self, **{name: value for name, value in overrides.items() if value is not None})
 
-@dataclass
+
+@dataclass(frozen=True)
 class VisualizationConfig:
     timeline_unit: str = "bar"
     show_grid: bool = True
@@ -136,48 +183,27 @@ class VisualizationConfig:
     transparent: bool = False
     show_connections: bool = False
     connections: ConnectionConfig = field(default_factory=ConnectionConfig)
+    rasterize_notes: bool = True  # Rasterize note bars/connections in vector outputs (SVG/PDF)
+    tight_bbox: bool = False  # Crop the saved image to its artists (costs an extra render pass)
+    auto_hide_edges: bool = True  # Skip bar outlines when bars average under MIN_EDGE_BAR_PX wide
+    cull_subpixel_bars: bool = False  # Drop bars narrower than MIN_VISIBLE_BAR_PX (lossy; for very dense scores)
 
-    def with_overrides(
-        self,
-        timeline_unit: Optional[str] = None,
-        show_grid: Optional[bool] = None,
-        minimal: Optional[bool] = None,
-        ensemble: Optional[str] = None,
-        show_legend: Optional[bool] = None,
-        show_title: Optional[bool] = None,
-        write_output: Optional[bool] = None,
-        time_stretch: Optional[float] = None,
-        fig_width: Optional[float] = None,
-        dpi: Optional[int] = None,
-        transparent: Optional[bool] = None,
-        show_connections: Optional[bool] = None,
-        connections: Optional[ConnectionConfig] = None,
-    ) -> "VisualizationConfig":
+    def with_overrides(self, **overrides: Any) -> "VisualizationConfig":
         """
-        Build a new config overriding only the provided values.
+        Build a new config overriding only the provided (non-None) values.
         """
-        return replace(
-            self,
-            timeline_unit=self.timeline_unit if timeline_unit is None else timeline_unit,
-            show_grid=self.show_grid if show_grid is None else show_grid,
-            minimal=self.minimal if minimal is None else minimal,
-            ensemble=self.ensemble if ensemble is None else ensemble,
-            show_legend=self.show_legend if show_legend is None else show_legend,
-            show_title=self.show_title if show_title is None else show_title,
-            write_output=self.write_output if write_output is None else write_output,
-            time_stretch=self.time_stretch if time_stretch is None else time_stretch,
-            fig_width=self.fig_width if fig_width is None else fig_width,
-            dpi=self.dpi if dpi is None else dpi,
-            transparent=self.transparent if transparent is None else transparent,
-            show_connections=self.show_connections if show_connections is None else show_connections,
-            connections=self.connections if connections is None else connections,
-        )
+        return replace(self, **{name: value for name, value in overrides.items() if value is not None})
+
+
+# Shared defaults; both configs are frozen, so one instance serves every call
+_DEFAULT_CONNECTION_CONFIG = ConnectionConfig()
+_DEFAULT_VISUALIZATION_CONFIG = VisualizationConfig()
 
 
 @dataclass
 class VisualizationContext:
-    fig: plt.Figure
-    ax: plt.Axes
+    fig: Figure
+    ax: Axes
     clamped_dpi: int
     bounds: PlotBounds
     pitch_padding: float
@@ -188,7 +214,7 @@ class VisualizationContext:
 
 @dataclass
 class VisualizationInputs:
-    note_events: List[NoteEvent]
+    note_events: Union[List[NoteEvent], NoteEventArray]
     rehearsal_marks: Optional[List[RehearsalMark]] = None
     measure_ticks: Optional[List[tuple[int, float]]] = None
     connections: Optional[List[Tuple[int, int]]] = None
@@ -202,22 +228,40 @@ class TimeTickSpec:
     labels: List[str]
 
 
-def _validate_note_events(note_events: List[NoteEvent]) -> None:
-    if not note_events:
+def _validate_note_events(note_events: Union[List[NoteEvent], NoteEventArray]) -> None:
+    if not len(note_events):
         raise ValueError("No notes found in the MusicXML file")
 
 
-def compute_plot_bounds(note_events: List[NoteEvent], score_duration: Optional[float]) -> PlotBounds:
-    min_duration = min(event.duration for event in note_events)
-    min_pitch = min(event.pitch_midi for event in note_events)
-    max_pitch = max(event.pitch_midi for event in note_events)
+def _as_event_array(note_events: Union[List[NoteEvent], NoteEventArray]) -> NoteEventArray:
+    if isinstance(note_events, NoteEventArray):
+        return note_events
+    return NoteEventArray.from_events(note_events)
+
+
+def compute_plot_bounds(
+    note_events: Union[List[NoteEvent], NoteEventArray],
+    score_duration: Optional[float],
+) -> PlotBounds:
+    if isinstance(note_events, NoteEventArray):
+        pitches, starts, durations = note_events.pitch_midi, note_events.start_time, note_events.duration
+    else:
+        # One pass to pull (pitch, start, duration) columns; the reductions then run in NumPy
+        columns = np.array(
+            [(event.pitch_midi, event.start_time, event.duration) for event in note_events],
+            dtype=np.float64,
+        )
+        pitches, starts, durations = columns[:, 0], columns[:, 1], columns[:, 2]
+    min_duration = float(durations.min())
+    min_pitch = float(pitches.min())
+    max_pitch = float(pitches.max())
 
     if score_duration is not None:
         max_time = score_duration
         min_time = 0.0
     else:
-        max_time = max(event.start_time + event.duration for event in note_events)
-        min_time = min(event.start_time for event in note_events)
+        max_time = float((starts + durations).max())
+        min_time = float(starts.min())
 
     return PlotBounds(
         min_duration=min_duration,
@@ -228,6 +272,7 @@ def compute_plot_bounds(note_events: List[NoteEvent], score_duration: Optional[f
     )
 
 
+@lru_cache(maxsize=32)
 def compute_figure_dimensions(
     bounds: PlotBounds,
     time_stretch: float,
@@ -253,7 +298,11 @@ def compute_figure_dimensions(
 
 def _create_figure(fig_width: float, fig_height: float, dpi: int, transparent: bool):
     clamped_dpi = max(50, min(600, int(dpi)))
-    fig, ax = plt.subplots(figsize=(fig_width, fig_height), dpi=clamped_dpi)
+    # A standalone Figure keeps rendering off the global pyplot state, so separate
+    # threads or worker processes can each build their own figure
+    fig = Figure(figsize=(fig_width, fig_height), dpi=clamped_dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
 
     if transparent:
         fig.patch.set_facecolor("none")
@@ -262,172 +311,276 @@ def _create_figure(fig_width: float, fig_height: float, dpi: int, transparent: b
     return fig, ax, clamped_dpi
 
 
-def _prepare_color_context(note_events: List[NoteEvent], family_mode: bool, ensemble: str) -> ColorContext:
+def _apply_margins(fig: Figure, minimal: bool, has_title: bool) -> None:
+    width, height = fig.get_size_inches()
+    if minimal:
+        left = right = bottom = top = FIG_MARGIN
+    else:
+        left, right, bottom = LABEL_MARGIN_LEFT, LABEL_MARGIN_RIGHT, LABEL_MARGIN_BOTTOM
+        top = TITLE_MARGIN_TOP if has_title else FIG_MARGIN
+    fig.subplots_adjust(left=left / width, right=1 - right / width, bottom=bottom / height, top=1 - top / height)
+
+
+def _prepare_color_context(
+    note_events: Union[List[NoteEvent], NoteEventArray],
+    family_mode: bool,
+    ensemble: str,
+) -> ColorContext:
+    events = _as_event_array(note_events)
     color_map: dict[str, str] = {}
     legend_labels: list[str] = []
     families_present: set[str] = set()
 
     if not family_mode:
-        for event in note_events:
-            label = event.instrument_label
-            if label not in color_map:
-                color_map[label] = get_individual_color(len(color_map))
-                legend_labels.append(label)
+        # dict.fromkeys keeps first-seen order, which fixes each label's palette slot
+        legend_labels = list(dict.fromkeys(events.instrument_label.tolist()))
+        color_map = {label: get_individual_color(index) for index, label in enumerate(legend_labels)}
     else:
-        families_present = {event.instrument_family for event in note_events}
+        families_present = set(events.instrument_family.tolist())
 
-    return ColorContext(color_map=color_map, legend_labels=legend_labels, families_present=families_present)
+    color_context = ColorContext(color_map=color_map, legend_labels=legend_labels, families_present=families_present)
+    color_context.labels_to_idx, color_context.palette, color_context.event_colors = _compute_event_rgba(
+        events, color_context, family_mode, ensemble
+    )
+    return color_context
 
 
-def _color_for_event(
-    event: NoteEvent,
+@lru_cache(maxsize=32)
+def _compute_base_bar_height(pitch_range: float) -> float:
+    return max(0.3, min(0.8, 1.0 / max(1, pitch_range / 20)))
+
+
+def _compute_bar_visuals(
+    events: NoteEventArray,
+    base_bar_height: float,
+    dynamic_range: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-note bar heights (widened by pitch overlap) and alphas (from dynamics), as arrays.
+    """
+    overlap_scale = np.minimum(1 + (events.pitch_overlap - 1) * 0.35, 3.0)
+    heights = base_bar_height * overlap_scale
+
+    return heights, _dynamic_alphas(events.dynamic_level, dynamic_range)
+
+
+def _dynamic_alphas(dynamic_level: np.ndarray, dynamic_range: float) -> np.ndarray:
+    # min(0.95, 0.35 + 0.45 * clip((level - MIN) / range, 0, 1)), evaluated in place in one buffer
+    if dynamic_range == 0:
+        alphas = np.zeros(len(dynamic_level))
+    else:
+        alphas = np.subtract(dynamic_level, MIN_DYNAMIC_LEVEL, dtype=np.float64)
+        alphas /= dynamic_range
+        np.clip(alphas, 0.0, 1.0, out=alphas)
+    alphas *= 0.45
+    alphas += 0.35
+    return np.minimum(alphas, 0.95, out=alphas)
+
+
+def _compute_event_rgba(
+    events: NoteEventArray,
     color_context: ColorContext,
     family_mode: bool,
     ensemble: str,
-) -> str:
-    if not family_mode:
-        return color_context.color_map[event.instrument_label]
-    return get_family_color(event.instrument_family, ensemble=ensemble)
+) -> tuple[dict[str, int], np.ndarray, np.ndarray]:
+    """
+    Index and RGBA palette of the distinct labels/families, plus per-note colors fanned out by index.
+    """
+    keys = events.instrument_family if family_mode else events.instrument_label
+    key_index: dict[str, int] = {}
+    codes = [key_index.setdefault(key, len(key_index)) for key in keys.tolist()]
+    if family_mode:
+        table = [get_family_color(key, ensemble=ensemble) for key in key_index]
+    else:
+        table = [color_context.color_map[key] for key in key_index]
+    palette = to_rgba_array(table)
+    return key_index, palette, palette[codes]
 
 
-def _compute_base_bar_height(pitch_range: float) -> float:
-    return max(0.3, min(0.8, 1.0 / max(1, pitch_range / 20)))
+def _event_colors(
+    events: Union[List[NoteEvent], NoteEventArray],
+    color_context: ColorContext,
+    family_mode: bool,
+    ensemble: str,
+) -> np.ndarray:
+    if color_context.event_colors is not None:
+        return color_context.event_colors
+    _, _, event_colors = _compute_event_rgba(_as_event_array(events), color_context, family_mode, ensemble)
+    return event_colors
+
+
+def _pixels_per_beat(bounds: PlotBounds, fig_width: float, dpi: int) -> float:
+    """
+    Approximate horizontal pixels covered by one beat of the timeline.
+    """
+    if bounds.time_range <= 0:
+        return math.inf
+    return fig_width * dpi / bounds.time_range
 
 
 def _draw_note_bars(
     ax,
-    note_events: List[NoteEvent],
+    note_events: Union[List[NoteEvent], NoteEventArray],
     color_context: ColorContext,
     family_mode: bool,
     ensemble: str,
     base_bar_height: float,
     dynamic_range: float,
+    rasterized: bool = False,
+    draw_edges: bool = True,
+    min_duration: float = 0.0,
 ) -> None:
-    def _note_alpha(dynamic_level: float) -> float:
-        normalized_dynamic = 0.0 if dynamic_range == 0 else (dynamic_level - MIN_DYNAMIC_LEVEL) / dynamic_range
-        normalized_dynamic = max(0.0, min(1.0, normalized_dynamic))
-        return min(0.95, 0.35 + 0.45 * normalized_dynamic)
-
-    for event in note_events:
-        color = _color_for_event(event, color_context, family_mode, ensemble)
-
-        overlap_scale = 1 + (event.pitch_overlap - 1) * 0.35
-        overlap_scale = min(overlap_scale, 3.0)
-        bar_height = base_bar_height * overlap_scale
-
-        alpha = _note_alpha(event.dynamic_level)
-
-        ax.barh(
-            event.pitch_midi,
-            event.duration,
-            left=event.start_time,
-            height=bar_height,
-            color=color,
-            alpha=alpha,
-            edgecolor="black",
-            linewidth=0.3,
+    events = _as_event_array(note_events)
+    heights, alphas = _compute_bar_visuals(events, base_bar_height, dynamic_range)
+    facecolors = _event_colors(events, color_context, family_mode, ensemble)
+    if min_duration > 0:
+        # Colors were resolved for the full score, so the legend still lists culled labels
+        visible = events.duration >= min_duration
+        events = events.take(visible)
+        heights, alphas, facecolors = heights[visible], alphas[visible], facecolors[visible]
+
+    # Same geometry as barh(align="center"): each bar is centered on its pitch
+    left = events.start_time
+    right = left + events.duration
+    bottom = events.pitch_midi - heights / 2
+    top = bottom + heights
+    verts = np.stack(
+        [
+            np.column_stack([left, bottom]),
+            np.column_stack([right, bottom]),
+            np.column_stack([right, top]),
+            np.column_stack([left, top]),
+        ],
+        axis=1,
+    )
+
+    # Per-note alpha applies to both face and edge, matching an alpha= on each bar
+    facecolors = facecolors.copy()
+    facecolors[:, 3] = alphas
+    if draw_edges:
+        edgecolors = np.zeros_like(facecolors)
+        edgecolors[:, 3] = alphas
+    else:
+        edgecolors = "none"
+    # One collection for every bar instead of an ax.barh artist per note
+    ax.add_collection(
+        PolyCollection(
+            verts,
+            facecolors=facecolors,
+            edgecolors=edgecolors,
+            linewidths=0.3,
+            rasterized=rasterized,
         )
+    )
 
 
 def _draw_note_connections(
     ax,
-    note_events: List[NoteEvent],
+    note_events: Union[List[NoteEvent], NoteEventArray],
     connections: Optional[List[Tuple[int, int]]],
     color_context: ColorContext,
     family_mode: bool,
     ensemble: str,
     connection_config: ConnectionConfig,
     dynamic_range: float,
+    rasterized: bool = False,
 ) -> None:
     if not connections:
         return
 
-    def _note_alpha(dynamic_level: float) -> float:
-        normalized_dynamic = 0.0 if dynamic_range == 0 else (dynamic_level - MIN_DYNAMIC_LEVEL) / dynamic_range
-        normalized_dynamic = max(0.0, min(1.0, normalized_dynamic))
-        return min(0.95, 0.35 + 0.45 * normalized_dynamic)
-
-    for note1_idx, note2_idx in connections:
-        if note1_idx >= len(note_events) or note2_idx >= len(note_events):
-            continue
-
-        note1 = note_events[note1_idx]
-        note2 = note_events[note2_idx]
-
-        x1 = note1.start_time + note1.duration
-        y1 = note1.pitch_midi
-        x2 = note2.start_time
-        y2 = note2.pitch_midi
-
-        # Same-pitch staccato repeats should stay straight even if curves are enabled
-        same_pitch = note1.pitch_midi == note2.pitch_midi
-        is_shortened = (note1.duration + 1e-9) < note1.original_duration
-        force_straight = same_pitch and is_shortened
-
-        gap = x2 - x1
-        if connection_config.max_gap is not None and gap > connection_config.max_gap:
-            continue
-
-        connection_color = _color_for_event(note1, color_context, family_mode, ensemble)
-
-        # Base alpha derived from surrounding note dynamics, scaled by configured alpha
-        note_alpha_avg = (_note_alpha(note1.dynamic_level) + _note_alpha(note2.dynamic_level)) / 2.0
-        scale = connection_config.alpha / DEFAULT_CONNECTION_ALPHA if DEFAULT_CONNECTION_ALPHA > 0 else 1.0
-        base_alpha = max(0.0, min(1.0, note_alpha_avg * scale))
-        alpha = connection_config.alpha_for_length(
-            gap if gap >= 0 else 0.0,
-            base_alpha=base_alpha,
-            min_alpha=connection_config.min_alpha,
-        )
+    events = _as_event_array(note_events)
+    # A link takes its source note's color, looked up by event index
+    event_colors = _event_colors(events, color_context, family_mode, ensemble)
+
+    pairs = np.asarray(connections, dtype=np.intp).reshape(-1, 2)
+    src, dst = pairs[(pairs < len(events)).all(axis=1)].T
+    x1 = events.start_time[src] + events.duration[src]
+    y1 = events.pitch_midi[src]
+    x2 = events.start_time[dst]
+    y2 = events.pitch_midi[dst]
+    gap = x2 - x1
+    if connection_config.max_gap is not None:
+        keep = ~(gap > connection_config.max_gap)
+        src, dst, x1, y1, x2, y2, gap = (column[keep] for column in (src, dst, x1, y1, x2, y2, gap))
+    if not len(src):
+        return
 
-        # Scale curve height by pitch distance; zero when pitches match
-        pitch_delta = abs(y2 - y1)
-        if same_pitch:
-            pitch_scale = 0.0
-        else:
-            # Ease small intervals upward and gently clamp large ones
-            pitch_norm = min(pitch_delta / 24.0, 1.0)
-            pitch_scale = 0.5 + (2.0 - 0.5) * (pitch_norm ** 0.6)
-        effective_curve = connection_config.curve_height_factor * pitch_scale
-
-        # Give vertical/near-vertical links a small span so curvature is visible
-        min_curve_span = 0.02
-        base_dx = max(gap, min_curve_span)
-        # Use geometric distance to reflect both time gap and pitch jump; exponent softens extremes
-        span = hypot(base_dx, pitch_delta) ** 0.5
-
-        use_curve = effective_curve > 0 and gap >= 0 and not force_straight
-
-        if use_curve:
-            cx = x1 + base_dx / 2.0 if x2 >= x1 else (x1 + x2) / 2.0
-            cy = (y1 + y2) / 2.0 + effective_curve * span
-            path_data = [
-                (MplPath.MOVETO, (x1, y1)),
-                (MplPath.CURVE3, (cx, cy)),
-                (MplPath.CURVE3, (x2, y2)),
-            ]
-            codes, verts = zip(*path_data)
-            path = MplPath(verts, codes)
-            patch = PathPatch(
-                path,
-                facecolor="none",
-                edgecolor=connection_color,
-                linewidth=connection_config.linewidth,
-                alpha=alpha,
-                linestyle="-",
+    # Base alpha derived from surrounding note dynamics, scaled by configured alpha, then faded by length
+    note_alpha_avg = (
+        _dynamic_alphas(events.dynamic_level[src], dynamic_range)
+        + _dynamic_alphas(events.dynamic_level[dst], dynamic_range)
+    ) / 2.0
+    scale = connection_config.alpha / DEFAULT_CONNECTION_ALPHA if DEFAULT_CONNECTION_ALPHA > 0 else 1.0
+    alphas = connection_config.alpha_for_lengths(
+        np.maximum(gap, 0.0),
+        base_alpha=np.clip(note_alpha_avg * scale, 0.0, 1.0),
+        min_alpha=connection_config.min_alpha,
+    )
+
+    # Same-pitch staccato repeats should stay straight even if curves are enabled
+    same_pitch = y1 == y2
+    is_shortened = (events.duration[src] + 1e-9) < events.original_duration[src]
+    force_straight = same_pitch & is_shortened
+
+    # Scale curve height by pitch distance; zero when pitches match.
+    # Small intervals are eased upward and large ones gently clamped.
+    pitch_delta = np.abs(y2 - y1)
+    pitch_norm = np.minimum(pitch_delta / 24.0, 1.0)
+    pitch_scale = np.where(same_pitch, 0.0, 0.5 + (2.0 - 0.5) * (pitch_norm ** 0.6))
+    effective_curve = connection_config.curve_height_factor * pitch_scale
+
+    # Give vertical/near-vertical links a small span so curvature is visible
+    min_curve_span = 0.02
+    base_dx = np.maximum(gap, min_curve_span)
+    # Use geometric distance to reflect both time gap and pitch jump; exponent softens extremes
+    span = np.hypot(base_dx, pitch_delta) ** 0.5
+
+    curve_mask = (effective_curve > 0) & (gap >= 0) & ~force_straight
+    line_mask = ~curve_mask
+
+    # Quadratic Bezier control points for every curve at once: (start, control, end) per row
+    cx = np.where(x2 >= x1, x1 + base_dx / 2.0, (x1 + x2) / 2.0)
+    cy = (y1 + y2) / 2.0 + effective_curve * span
+    curve_vertices = np.stack(
+        [np.column_stack([x1, y1]), np.column_stack([cx, cy]), np.column_stack([x2, y2])], axis=1
+    )[curve_mask]
+    curve_codes = np.array([MplPath.MOVETO, MplPath.CURVE3, MplPath.CURVE3], dtype=MplPath.code_type)
+    curve_paths = [MplPath(vertices, curve_codes) for vertices in curve_vertices]
+    line_segments = np.stack([np.column_stack([x1, y1]), np.column_stack([x2, y2])], axis=1)[line_mask]
+
+    if len(line_segments):
+        rgba = event_colors[src[line_mask]]
+        rgba[:, 3] = alphas[line_mask]
+        # Cap style matches the Line2D defaults these segments were previously drawn with
+        ax.add_collection(
+            LineCollection(
+                line_segments,
+                colors=rgba,
+                linewidths=connection_config.linewidth,
+                linestyles="-",
+                capstyle="projecting",
+                joinstyle="round",
                 zorder=0.5,
+                rasterized=rasterized,
             )
-            ax.add_patch(patch)
-        else:
-            ax.plot(
-                [x1, x2],
-                [y1, y2],
-                color=connection_color,
-                linewidth=connection_config.linewidth,
-                alpha=alpha,
-                linestyle="-",
+        )
+    if curve_paths:
+        rgba = event_colors[src[curve_mask]]
+        rgba[:, 3] = alphas[curve_mask]
+        # Cap/join styles match the PathPatch defaults these curves were previously drawn with
+        ax.add_collection(
+            PathCollection(
+                curve_paths,
+                facecolors="none",
+                edgecolors=rgba,
+                linewidths=connection_config.linewidth,
+                linestyles="-",
+                capstyle="butt",
+                joinstyle="miter",
                 zorder=0.5,
+                rasterized=rasterized,
             )
+        )
 
 
 def _apply_axis_labels(ax, timeline_unit: str, minimal: bool) -> None:
@@ -449,9 +602,15 @@ def compute_padding(
     minimal: bool,
     rehearsal_marks: Optional[List[RehearsalMark]],
 ) -> tuple[float, float, float]:
+    # Only the presence of rehearsal marks matters, which keeps the cached key hashable
+    return _compute_padding(bounds, minimal, bool(rehearsal_marks))
+
+
+@lru_cache(maxsize=32)
+def _compute_padding(bounds: PlotBounds, minimal: bool, has_rehearsal_marks: bool) -> tuple[float, float, float]:
     pitch_padding = max(1, bounds.pitch_range * 0.05)
     time_padding = max(0.5, bounds.time_range * 0.02)
-    extra_top_padding = 0.0 if minimal or not rehearsal_marks else max(1.0, bounds.pitch_range * 0.08)
+    extra_top_padding = 0.0 if minimal or not has_rehearsal_marks else max(1.0, bounds.pitch_range * 0.08)
     return pitch_padding, time_padding, extra_top_padding
 
 
@@ -477,18 +636,16 @@ def generate_time_ticks(
         labels = [str(num) for num, _ in measure_ticks]
         return TimeTickSpec(major=major_xticks, minor=[], labels=labels)
 
-    major_xticks: List[float] = []
-    beat = 0
-    while beat <= bounds.max_time + time_padding:
-        major_xticks.append(beat)
-        beat += 1
+    limit = bounds.max_time + time_padding
+    major_xticks: List[float] = list(range(math.floor(limit) + 1)) if limit >= 0 else []
 
     minor_xticks: List[float] = []
-    if bounds.min_duration > 0:
-        tick = bounds.min_time
-        while tick <= bounds.max_time + time_padding:
-            minor_xticks.append(tick)
-            tick += bounds.min_duration
+    if bounds.min_duration > 0 and bounds.min_time <= limit:
+        # cumsum adds the step sequentially, reproducing repeated `tick += min_duration` bit for bit;
+        # two spare steps absorb rounding in the count, and the monotonic run is trimmed at the limit
+        count = int((limit - bounds.min_time) // bounds.min_duration) + 2
+        ticks = np.cumsum(np.concatenate(([bounds.min_time], np.full(count, bounds.min_duration))))
+        minor_xticks = ticks[ticks <= limit].tolist()
 
     beat_labels = [f"{tick + 1:g}" for tick in major_xticks]
     return TimeTickSpec(major=major_xticks, minor=minor_xticks, labels=beat_labels)
@@ -513,24 +670,8 @@ def _apply_pitch_ticks(ax, bounds: PlotBounds, pitch_padding: float, minimal: bo
 
 
 def _apply_minimal_style(ax) -> None:
-    ax.set_xticklabels([])
-    ax.set_yticklabels([])
-    ax.spines["top"].set_visible(False)
-    ax.spines["right"].set_visible(False)
-    ax.spines["bottom"].set_visible(False)
-    ax.spines["left"].set_visible(False)
-    ax.tick_params(
-        left=False,
-        bottom=False,
-        top=False,
-        right=False,
-        labelleft=False,
-        labelbottom=False,
-        labeltop=False,
-        labelright=False,
-        length=0,
-        width=0,
-    )
+    # One flag skips drawing ticks, tick labels, spines and axis labels altogether
+    ax.set_axis_off()
 
 
 def _draw_rehearsal_marks(
@@ -541,15 +682,25 @@ def _draw_rehearsal_marks(
     extra_top_padding: float,
 ) -> None:
     label_y = bounds.max_pitch + pitch_padding + extra_top_padding * 0.5
-    for mark in rehearsal_marks:
-        ax.axvline(
-            mark.start_time,
-            color="black",
+    # One collection of full-height dashed lines (x in data, y in axes coords, like axvline)
+    mark_times = np.array([mark.start_time for mark in rehearsal_marks], dtype=float)
+    segments = np.zeros((len(mark_times), 2, 2))
+    segments[:, :, 0] = mark_times[:, None]
+    segments[:, 1, 1] = 1.0
+    ax.add_collection(
+        LineCollection(
+            segments,
+            colors="black",
             alpha=0.35,
-            linestyle="--",
-            linewidth=0.9,
+            linestyles="--",
+            linewidths=0.9,
+            capstyle="butt",
             zorder=0.5,
-        )
+            transform=ax.get_xaxis_transform(),
+        ),
+        autolim=False,
+    )
+    for mark in rehearsal_marks:
         ax.text(
             mark.start_time,
             label_y,
@@ -574,37 +725,18 @@ def _build_legend(
 ) -> None:
     legend_elements = []
 
-    if not family_mode:
+    if family_mode and ensemble in _LEGEND_CONFIGS:
+        family_order, unknown_family = _LEGEND_CONFIGS[ensemble]
+        for family in family_order:
+            if family in color_context.families_present:
+                color = get_family_color(family, ensemble=ensemble)
+                legend_elements.append(mpatches.Patch(color=color, label=_FAMILY_DISPLAY_NAMES[family]))
+        if unknown_family in color_context.families_present:
+            color = get_family_color(unknown_family, ensemble=ensemble)
+            legend_elements.append(mpatches.Patch(color=color, label="Unknown"))
+    else:
         for label in color_context.legend_labels:
             legend_elements.append(mpatches.Patch(color=color_context.color_map[label], label=label))
-    else:
-        def add_family_legend(family_order: List[str], unknown_family: str) -> None:
-            for family in family_order:
-                if family in color_context.families_present:
-                    color = get_family_color(family, ensemble=ensemble)
-                    label = family.replace("_", " ").title()
-                    legend_elements.append(mpatches.Patch(color=color, label=label))
-            if unknown_family in color_context.families_present:
-                color = get_family_color(unknown_family, ensemble=ensemble)
-                legend_elements.append(mpatches.Patch(color=color, label="Unknown"))
-
-        legend_configs = {
-            ENSEMBLE_BIGBAND: (
-                [BIGBAND_TRUMPETS, BIGBAND_TROMBONES, BIGBAND_SAXOPHONES, BIGBAND_RHYTHM_SECTION],
-                BIGBAND_UNKNOWN,
-            ),
-            ENSEMBLE_ORCHESTRA: (
-                [ORCHESTRA_STRINGS, ORCHESTRA_WINDS, ORCHESTRA_BRASS, ORCHESTRA_PERCUSSION],
-                ORCHESTRA_UNKNOWN,
-            ),
-        }
-
-        if ensemble in legend_configs:
-            family_order, unknown_family = legend_configs[ensemble]
-            add_family_legend(family_order, unknown_family)
-        else:
-            for label in color_context.legend_labels:
-                legend_elements.append(mpatches.Patch(color=color_context.color_map[label], label=label))
 
     if legend_elements and not minimal and show_legend:
         if show_connections:
@@ -645,7 +777,7 @@ def _apply_grid(ax, show_grid: bool) -> None:
 
 
 def create_visualization(
-    note_events: List[NoteEvent],
+    note_events: Union[List[NoteEvent], NoteEventArray],
     output_path: Path,
     title: Optional[str] = None,
     score_duration: Optional[float] = None,
@@ -668,9 +800,15 @@ def create_visualization(
     config: Optional[VisualizationConfig] = None,
     inputs: Optional[VisualizationInputs] = None,
     connection_config: Optional[ConnectionConfig] = None,
-) -> None:
+    executor: Optional[Executor] = None,
+) -> Optional[Future]:
     """
     Create a 2D visualization of note events and save as PNG.
+
+    With an executor, the save (rendering and image encoding) is submitted to it and the
+    Future is returned, so a batch caller can prepare the next score meanwhile. The figure
+    is not shared with pyplot, but Matplotlib text rendering is not thread-safe across
+    concurrent saves, so use a single-worker executor.
     """
     if inputs is not None:
         note_events = inputs.note_events
@@ -685,7 +823,7 @@ def create_visualization(
 
     _validate_note_events(note_events)
 
-    resolved_config = (config or VisualizationConfig()).with_overrides(
+    resolved_config = (config or _DEFAULT_VISUALIZATION_CONFIG).with_overrides(
         timeline_unit=timeline_unit,
         show_grid=show_grid,
         minimal=minimal,
@@ -700,9 +838,11 @@ def create_visualization(
         show_connections=show_connections,
         connections=connection_config,
     )
-    resolved_connection_config = resolved_config.connections if resolved_config.connections else ConnectionConfig()
+    resolved_connection_config = resolved_config.connections or _DEFAULT_CONNECTION_CONFIG
 
-    bounds = compute_plot_bounds(note_events, score_duration)
+    # Column form shared by the whole-score passes (bounds, colors, bars, connections)
+    event_array = _as_event_array(note_events)
+    bounds = compute_plot_bounds(event_array, score_duration)
     fig_width, fig_height = compute_figure_dimensions(bounds, resolved_config.time_stretch, resolved_config.fig_width)
     fig, ax, clamped_dpi = _create_figure(fig_width, fig_height, resolved_config.dpi, resolved_config.transparent)
 
@@ -721,35 +861,45 @@ def create_visualization(
     )
 
     family_mode = resolved_config.ensemble in (ENSEMBLE_BIGBAND, ENSEMBLE_ORCHESTRA)
-    color_context = _prepare_color_context(note_events, family_mode, resolved_config.ensemble)
+    color_context = _prepare_color_context(event_array, family_mode, resolved_config.ensemble)
     base_bar_height = _compute_base_bar_height(bounds.pitch_range)
     dynamic_range = MAX_DYNAMIC_LEVEL - MIN_DYNAMIC_LEVEL
+    px_per_beat = _pixels_per_beat(bounds, fig_width, clamped_dpi)
 
     _draw_note_bars(
         ctx.ax,
-        note_events,
+        event_array,
         color_context,
         family_mode,
         resolved_config.ensemble,
         base_bar_height,
         dynamic_range,
+        rasterized=resolved_config.rasterize_notes,
+        # Sub-pixel bars hide their 0.3pt outline anyway, so skip stroking it
+        draw_edges=not (
+            resolved_config.auto_hide_edges
+            and px_per_beat * float(event_array.duration.mean()) < MIN_EDGE_BAR_PX
+        ),
+        min_duration=MIN_VISIBLE_BAR_PX / px_per_beat if resolved_config.cull_subpixel_bars else 0.0,
     )
 
     if resolved_config.show_connections and connections:
         _draw_note_connections(
             ctx.ax,
-            note_events,
+            event_array,
             connections,
             color_context,
             family_mode,
             resolved_config.ensemble,
             resolved_connection_config,
             dynamic_range,
+            rasterized=resolved_config.rasterize_notes,
         )
 
     _apply_axis_labels(ctx.ax, resolved_config.timeline_unit, resolved_config.minimal)
 
-    if title and not resolved_config.minimal and resolved_config.show_title:
+    has_title = bool(title) and not resolved_config.minimal and resolved_config.show_title
+    if has_title:
         ctx.ax.set_title(title, fontsize=14, fontweight="bold")
 
     _set_axis_limits(ctx.ax, bounds, pitch_padding, time_padding, extra_top_padding)
@@ -775,12 +925,16 @@ def create_visualization(
     )
     _apply_grid(ctx.ax, resolved_config.show_grid)
 
-    plt.tight_layout()
-    if resolved_config.write_output:
-        ctx.fig.savefig(
-            output_path,
-            dpi=ctx.clamped_dpi,
-            bbox_inches="tight",
-            transparent=resolved_config.transparent,
-        )
-    plt.close(ctx.fig)
+    _apply_margins(ctx.fig, resolved_config.minimal, has_title)
+    if not resolved_config.write_output:
+        return None
+    save_kwargs = dict(
+        dpi=ctx.clamped_dpi,
+        # The margins already fit the labels; a tight bbox re-renders to crop further
+        bbox_inches="tight" if resolved_config.tight_bbox else None,
+        transparent=resolved_config.transparent,
+    )
+    if executor is not None:
+        return executor.submit(ctx.fig.savefig, output_path, **save_kwargs)
+    ctx.fig.savefig(output_path, **save_kwargs)
+    return None
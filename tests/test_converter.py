@@ -1,13 +1,15 @@
 """Unit tests for MusicXML conversion and visualization."""
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import sys
 import tempfile
 
 import pytest
 from music21 import stream, note, instrument, chord, pitch, tie, dynamics, converter, expressions, articulations
-import matplotlib.pyplot as plt
+import matplotlib.image as mpimg
 
+from musicxml_to_png import visualize
 from musicxml_to_png.converter import convert_musicxml_to_png
 from musicxml_to_png import cli as cli_module
 from musicxml_to_png.extract import (
@@ -16,9 +18,16 @@ from musicxml_to_png.extract import (
     build_measure_offset_map,
     detect_note_connections,
 )
-from musicxml_to_png.visualize import create_visualization, ConnectionConfig
+from musicxml_to_png.visualize import (
+    create_visualization,
+    compute_figure_dimensions,
+    compute_plot_bounds,
+    ConnectionConfig,
+    VisualizationConfig,
+)
 from musicxml_to_png.models import (
     NoteEvent,
+    NoteEventArray,
     RehearsalMark,
     DEFAULT_DYNAMIC_LEVEL,
     MIN_DYNAMIC_LEVEL,
@@ -307,6 +316,24 @@ class TestExtractNotes:
         # Verify it's continuous (no gap)
         assert event_28_31[0].start_time + event_28_31[0].duration == 31.0
 
+    def test_consecutive_tie_pairs_on_same_pitch(self):
+        """Back-to-back ties on one pitch pair in order; an unmatched stop stays on its own."""
+        score = stream.Score()
+        part = stream.Part()
+        part.append(instrument.Flute())
+
+        for tie_type in ("stop", "start", "stop", "start", "stop"):
+            n = note.Note("C4")
+            n.quarterLength = 1.0
+            n.tie = tie.Tie(tie_type)
+            part.append(n)
+
+        score.append(part)
+
+        note_events = extract_notes(score, ensemble=ENSEMBLE_UNGROUPED)
+
+        assert [(e.start_time, e.duration) for e in note_events] == [(0.0, 1.0), (1.0, 2.0), (3.0, 2.0)]
+
     def test_non_tied_notes_unaffected(self):
         """Test that non-tied notes are not affected by tie merging logic."""
         score = stream.Score()
@@ -440,6 +467,42 @@ class TestExtractNotes:
         assert flute_events[1].duration == 1.0
         assert flute_events[1].pitch_overlap == 1
 
+    def test_instrument_label_ids_are_interned_per_label(self, multi_part_score):
+        """Each distinct instrument label gets one small integer id."""
+        note_events = extract_notes(multi_part_score, ensemble=ENSEMBLE_UNGROUPED)
+
+        ids_by_label = {e.instrument_label: e.instrument_label_id for e in note_events}
+        assert sorted(ids_by_label.values()) == [0, 1]
+        assert len(set(ids_by_label)) == 2
+
+    def test_pitch_overlap_split_on_shared_triplet_boundaries(self):
+        """Triplet boundaries shared across parts split cleanly without zero-length slivers."""
+        score = stream.Score()
+
+        part1 = stream.Part()
+        part1.append(instrument.Flute())
+        for quarter_length in (1 / 3, 2 / 3):
+            n = note.Note("C4")
+            n.quarterLength = quarter_length
+            part1.append(n)
+        score.insert(0, part1)
+
+        part2 = stream.Part()
+        part2.append(instrument.Oboe())
+        n = note.Note("C4")
+        n.quarterLength = 1.0
+        part2.append(n)
+        score.insert(0, part2)
+
+        note_events = extract_notes(score, ensemble=ENSEMBLE_ORCHESTRA)
+
+        assert len(note_events) == 4
+        assert all(event.duration > 0 for event in note_events)
+        assert all(event.pitch_overlap == 2 for event in note_events)
+        oboe_events = [e for e in note_events if e.instrument_label == "Oboe"]
+        assert [e.start_time for e in oboe_events] == pytest.approx([0.0, 1 / 3])
+        assert sum(e.duration for e in oboe_events) == pytest.approx(1.0)
+
     def test_pitch_overlap_legacy_mode_without_splitting(self):
         """Legacy behavior keeps entire note thick when any portion overlaps."""
         score = stream.Score()
@@ -624,6 +687,26 @@ class TestExtractNotes:
 
         assert labels[:8] == ["A", "B", "C", "D", "E", "F", "G", "H"]
 
+    def test_note_event_array_round_trip(self):
+        """NoteEventArray keeps every field and Python value types through a round trip."""
+        events = [
+            NoteEvent(60.0, 0.0, 1.0, "Strings", "Violin", 0.7, "mf", 2, 1.5, "1", 0),
+            NoteEvent(64.0, 0.5, 0.25, "Brass", "Trumpet", 0.6, None, 1, 0.25, None),
+        ]
+        array = NoteEventArray.from_events(events)
+
+        assert len(array) == 2
+        restored = array.to_events()
+        fields = NoteEvent.__slots__
+        for original, copy in zip(events, restored):
+            assert [getattr(copy, f) for f in fields] == [getattr(original, f) for f in fields]
+        assert type(restored[0].pitch_overlap) is int
+        assert restored[0].instrument_label_id == 0
+        assert restored[1].instrument_label_id is None
+        assert type(array[1].start_time) is float
+        assert array[1].instrument_label == "Trumpet"
+        assert [e.pitch_midi for e in array.take([1]).to_events()] == [64.0]
+
 
 class TestCreateVisualization:
     """Test visualization creation."""
@@ -649,6 +732,146 @@ class TestCreateVisualization:
         assert output_path.exists()
         assert output_path.suffix == ".png"
 
+    def test_vector_output_rasterizes_notes_only(self, tmp_path):
+        """Note bars are embedded as a raster image in SVG output unless disabled."""
+        note_events = [
+            NoteEvent(pitch_midi=60.0, start_time=0.0, duration=1.0, instrument_family=ORCHESTRA_STRINGS),
+            NoteEvent(pitch_midi=64.0, start_time=1.0, duration=1.0, instrument_family=ORCHESTRA_WINDS),
+        ]
+
+        rasterized_path = tmp_path / "rasterized.svg"
+        create_visualization(note_events, rasterized_path, ensemble=ENSEMBLE_ORCHESTRA)
+        assert "<image" in rasterized_path.read_text()
+
+        vector_path = tmp_path / "vector.svg"
+        create_visualization(
+            note_events,
+            vector_path,
+            ensemble=ENSEMBLE_ORCHESTRA,
+            config=VisualizationConfig(rasterize_notes=False),
+        )
+        assert "<image" not in vector_path.read_text()
+
+    def test_png_matches_figure_size_unless_tight_bbox(self, tmp_path):
+        """Saved PNGs keep the computed figure size; tight_bbox crops them."""
+        note_events = [
+            NoteEvent(pitch_midi=60.0, start_time=0.0, duration=1.0, instrument_family=ORCHESTRA_STRINGS),
+            NoteEvent(pitch_midi=64.0, start_time=1.0, duration=1.0, instrument_family=ORCHESTRA_WINDS),
+        ]
+        bounds = compute_plot_bounds(note_events, score_duration=None)
+        fig_width, fig_height = compute_figure_dimensions(bounds, time_stretch=1.0, fig_width=None)
+
+        default_path = tmp_path / "default.png"
+        create_visualization(note_events, default_path, ensemble=ENSEMBLE_ORCHESTRA, dpi=60)
+        assert mpimg.imread(default_path).shape[:2] == (round(fig_height * 60), round(fig_width * 60))
+
+        tight_path = tmp_path / "tight.png"
+        create_visualization(
+            note_events,
+            tight_path,
+            ensemble=ENSEMBLE_ORCHESTRA,
+            dpi=60,
+            config=VisualizationConfig(tight_bbox=True),
+        )
+        assert mpimg.imread(tight_path).shape[:2] != mpimg.imread(default_path).shape[:2]
+
+    def test_dense_bars_skip_edges_unless_disabled(self, tmp_path, monkeypatch):
+        """Bars averaging under two pixels wide are drawn without outlines by default."""
+        note_events = [
+            NoteEvent(pitch_midi=60.0 + i % 12, start_time=float(i), duration=0.01, instrument_family=ORCHESTRA_STRINGS)
+            for i in range(200)
+        ]
+
+        captured_ax = []
+        real_create_figure = visualize._create_figure
+
+        def fake_create_figure(*args, **kwargs):
+            fig, ax, clamped_dpi = real_create_figure(*args, **kwargs)
+            captured_ax.append(ax)
+            return fig, ax, clamped_dpi
+
+        monkeypatch.setattr(visualize, "_create_figure", fake_create_figure)
+
+        create_visualization(note_events, tmp_path / "auto.png", write_output=False)
+        create_visualization(
+            note_events,
+            tmp_path / "edges.png",
+            write_output=False,
+            config=VisualizationConfig(auto_hide_edges=False),
+        )
+
+        auto_bars, edged_bars = (ax.collections[0] for ax in captured_ax)
+        assert len(auto_bars.get_edgecolor()) == 0
+        assert len(edged_bars.get_edgecolor()) == len(note_events)
+
+    def test_cull_subpixel_bars_drops_only_tiny_bars(self, tmp_path, monkeypatch):
+        """Opt-in culling removes sub-pixel bars but keeps their instruments in the legend."""
+        note_events = [
+            NoteEvent(pitch_midi=60.0, start_time=0.0, duration=100.0, instrument_family="violin"),
+            NoteEvent(pitch_midi=64.0, start_time=100.0, duration=0.001, instrument_family="flute"),
+        ]
+
+        captured_ax = []
+        real_create_figure = visualize._create_figure
+
+        def fake_create_figure(*args, **kwargs):
+            fig, ax, clamped_dpi = real_create_figure(*args, **kwargs)
+            captured_ax.append(ax)
+            return fig, ax, clamped_dpi
+
+        monkeypatch.setattr(visualize, "_create_figure", fake_create_figure)
+
+        # Measure ticks keep the tiny note from generating minor ticks at its duration
+        measure_ticks = [(1, 0.0)]
+        create_visualization(note_events, tmp_path / "all.png", measure_ticks=measure_ticks, write_output=False)
+        create_visualization(
+            note_events,
+            tmp_path / "culled.png",
+            measure_ticks=measure_ticks,
+            write_output=False,
+            config=VisualizationConfig(cull_subpixel_bars=True),
+        )
+
+        all_ax, culled_ax = captured_ax
+        assert len(all_ax.collections[0].get_paths()) == 2
+        assert len(culled_ax.collections[0].get_paths()) == 1
+        legend_labels = [text.get_text() for text in culled_ax.get_legend().get_texts()]
+        assert "flute" in legend_labels
+
+    def test_executor_saves_in_background(self, tmp_path):
+        """With an executor the save is submitted to it and its Future returned."""
+        output_path = tmp_path / "output.png"
+        note_events = [
+            NoteEvent(pitch_midi=60.0, start_time=0.0, duration=1.0, instrument_family=ORCHESTRA_STRINGS),
+        ]
+
+        assert create_visualization(note_events, tmp_path / "direct.png") is None
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = create_visualization(note_events, output_path, executor=executor)
+            assert future is not None
+            future.result()
+
+        assert output_path.exists()
+        assert output_path.read_bytes() == (tmp_path / "direct.png").read_bytes()
+
+    def test_visualization_accepts_note_event_array(self, tmp_path):
+        """Column-form note events render the same way as a list, connections included."""
+        output_path = tmp_path / "output.png"
+        note_events = NoteEventArray.from_events([
+            NoteEvent(pitch_midi=60.0, start_time=0.0, duration=1.0, instrument_family=ORCHESTRA_STRINGS),
+            NoteEvent(pitch_midi=64.0, start_time=1.0, duration=1.0, instrument_family=ORCHESTRA_WINDS),
+        ])
+
+        create_visualization(
+            note_events,
+            output_path,
+            ensemble=ENSEMBLE_ORCHESTRA,
+            show_connections=True,
+            connections=[(0, 1)],
+        )
+        assert output_path.exists()
+
     def test_grid_enabled(self, tmp_path):
         """Test visualization with grid enabled."""
         output_path = tmp_path / "output.png"
@@ -680,14 +903,14 @@ class TestCreateVisualization:
         ]
 
         captured_ax = {}
-        real_subplots = plt.subplots
+        real_create_figure = visualize._create_figure
 
-        def fake_subplots(*args, **kwargs):
-            fig, ax = real_subplots(*args, **kwargs)
+        def fake_create_figure(*args, **kwargs):
+            fig, ax, clamped_dpi = real_create_figure(*args, **kwargs)
             captured_ax["ax"] = ax
-            return fig, ax
+            return fig, ax, clamped_dpi
 
-        monkeypatch.setattr(plt, "subplots", fake_subplots)
+        monkeypatch.setattr(visualize, "_create_figure", fake_create_figure)
 
         create_visualization(
             note_events,
@@ -712,14 +935,14 @@ class TestCreateVisualization:
         measure_ticks = [(1, 0.0), (2, 4.0)]
 
         captured_ax = {}
-        real_subplots = plt.subplots
+        real_create_figure = visualize._create_figure
 
-        def fake_subplots(*args, **kwargs):
-            fig, ax = real_subplots(*args, **kwargs)
+        def fake_create_figure(*args, **kwargs):
+            fig, ax, clamped_dpi = real_create_figure(*args, **kwargs)
             captured_ax["ax"] = ax
-            return fig, ax
+            return fig, ax, clamped_dpi
 
-        monkeypatch.setattr(plt, "subplots", fake_subplots)
+        monkeypatch.setattr(visualize, "_create_figure", fake_create_figure)
 
         create_visualization(
             note_events,
@@ -864,10 +1087,10 @@ class TestCreateVisualization:
         captured_fig = {}
         captured_ax = {}
         captured_savefig_kwargs = {}
-        real_subplots = plt.subplots
+        real_create_figure = visualize._create_figure
         
-        def fake_subplots(*args, **kwargs):
-            fig, ax = real_subplots(*args, **kwargs)
+        def fake_create_figure(*args, **kwargs):
+            fig, ax, clamped_dpi = real_create_figure(*args, **kwargs)
             captured_fig["fig"] = fig
             captured_ax["ax"] = ax
             # Patch savefig on this specific figure instance
@@ -876,9 +1099,9 @@ class TestCreateVisualization:
                 captured_savefig_kwargs.update(save_kwargs)
                 return original_savefig(path, **save_kwargs)
             fig.savefig = patched_savefig
-            return fig, ax
+            return fig, ax, clamped_dpi
         
-        monkeypatch.setattr(plt, "subplots", fake_subplots)
+        monkeypatch.setattr(visualize, "_create_figure", fake_create_figure)
         
         create_visualization(
             note_events,
@@ -913,19 +1136,19 @@ class TestCreateVisualization:
         ]
         
         captured_savefig_kwargs = {}
-        real_subplots = plt.subplots
+        real_create_figure = visualize._create_figure
         
-        def fake_subplots(*args, **kwargs):
-            fig, ax = real_subplots(*args, **kwargs)
+        def fake_create_figure(*args, **kwargs):
+            fig, ax, clamped_dpi = real_create_figure(*args, **kwargs)
             # Patch savefig on this specific figure instance
             original_savefig = fig.savefig
             def patched_savefig(path, **save_kwargs):
                 captured_savefig_kwargs.update(save_kwargs)
                 return original_savefig(path, **save_kwargs)
             fig.savefig = patched_savefig
-            return fig, ax
+            return fig, ax, clamped_dpi
         
-        monkeypatch.setattr(plt, "subplots", fake_subplots)
+        monkeypatch.setattr(visualize, "_create_figure", fake_create_figure)
         
         create_visualization(
             note_events,
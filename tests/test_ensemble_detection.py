@@ -27,6 +27,16 @@ def test_detect_ensembles_prefers_orchestra_for_orchestral_mix():
     assert confidences[ENSEMBLE_ORCHESTRA] > confidences[ENSEMBLE_BIGBAND]
 
 
+def test_detect_ensembles_scores_bigband_for_string_heavy_scores_without_saxes():
+    score = _make_score([instrument.Violin, instrument.Violin, instrument.Violin, instrument.Trombone])
+    suggestions = detect_ensembles(score)
+    confidences = dict(suggestions)
+    assert suggestions[0][0] == ENSEMBLE_ORCHESTRA
+    assert confidences[ENSEMBLE_ORCHESTRA] == pytest.approx(1.0)
+    # Strings-heavy, sax-free scores keep their small nonzero bigband score
+    assert confidences[ENSEMBLE_BIGBAND] == pytest.approx(0.0533333, abs=1e-6)
+
+
 def test_detect_ensembles_prefers_bigband_for_core_sections():
     fixture_path = Path(__file__).parent / "fixtures" / "test-bigband-1.mxl"
     if not fixture_path.exists():
@@ -3,7 +3,10 @@
 import pytest
 
 from musicxml_to_png.instruments import (
+    classify_names,
+    classify_programs,
     get_instrument_family,
+    get_instrument_families,
     get_family_color,
     get_individual_color,
     ENSEMBLE_ORCHESTRA,
@@ -217,6 +220,58 @@ class TestBigbandInstrumentFamily:
         assert get_instrument_family(instrument_name="Violin", ensemble=ENSEMBLE_BIGBAND) == BIGBAND_UNKNOWN
 
 
+class TestMultiEnsembleFamilies:
+    """Test classifying one instrument against several ensembles at once."""
+
+    @pytest.mark.parametrize(
+        "midi_program,instrument_name",
+        [
+            (41, None),         # Violin by MIDI
+            (66, None),         # Alto Sax by MIDI
+            (None, "Trumpet"),
+            (None, "Double Bass"),
+            (None, "Unknown Instrument XYZ"),
+            (None, None),
+        ],
+    )
+    def test_matches_single_ensemble_lookups(self, midi_program, instrument_name):
+        """Test that each returned family matches the per-ensemble lookup."""
+        families = get_instrument_families(
+            midi_program=midi_program,
+            instrument_name=instrument_name,
+            ensembles=(ENSEMBLE_BIGBAND, ENSEMBLE_ORCHESTRA),
+        )
+        assert families == (
+            get_instrument_family(midi_program, instrument_name, ENSEMBLE_BIGBAND),
+            get_instrument_family(midi_program, instrument_name, ENSEMBLE_ORCHESTRA),
+        )
+
+    def test_preserves_requested_order(self):
+        """Test that families are returned in the order ensembles were requested."""
+        assert get_instrument_families(instrument_name="Violin", ensembles=(ENSEMBLE_ORCHESTRA, ENSEMBLE_BIGBAND)) == (
+            ORCHESTRA_STRINGS,
+            BIGBAND_UNKNOWN,
+        )
+
+
+class TestBatchClassification:
+    """Test array-based classification helpers."""
+
+    @pytest.mark.parametrize("ensemble", [ENSEMBLE_ORCHESTRA, ENSEMBLE_BIGBAND])
+    def test_classify_programs_matches_single_lookups(self, ensemble):
+        """Test that batch MIDI classification agrees with get_instrument_family, including out-of-range programs."""
+        programs = [-5, 0, 1, 41, 57, 66, 128, 129, 200]
+        families = classify_programs(programs, ensemble=ensemble)
+        assert list(families) == [get_instrument_family(midi_program=p, ensemble=ensemble) for p in programs]
+
+    def test_classify_names_matches_single_lookups(self):
+        """Test that batch name classification agrees with get_instrument_family."""
+        names = ["Violin", "Bass Clarinet", "Trumpet in Bb", None, "", "Unknown Instrument XYZ"]
+        families = classify_names(names, ensemble=ENSEMBLE_BIGBAND)
+        assert families.shape == (len(names),)
+        assert list(families) == [get_instrument_family(instrument_name=n, ensemble=ENSEMBLE_BIGBAND) for n in names]
+
+
 class TestColorMapping:
     """Test color mapping for instrument families."""
 
@@ -1,16 +1,20 @@
+import dataclasses
+
+import numpy as np
 import pytest
 
 from musicxml_to_png.visualize import (
     VisualizationConfig,
     PlotBounds,
     compute_plot_bounds,
+    _prepare_color_context,
     compute_figure_dimensions,
     compute_padding,
     generate_time_ticks,
     ConnectionConfig,
     DEFAULT_CONNECTION_ALPHA,
 )
-from musicxml_to_png.models import NoteEvent, MIN_DYNAMIC_LEVEL, MAX_DYNAMIC_LEVEL
+from musicxml_to_png.models import NoteEvent, NoteEventArray, MIN_DYNAMIC_LEVEL, MAX_DYNAMIC_LEVEL
 
 
 def _make_event(pitch: float, start: float, duration: float) -> NoteEvent:
@@ -33,6 +37,10 @@ def test_visualization_config_overrides_are_scoped():
     assert updated.show_grid is False
     assert updated.timeline_unit == base.timeline_unit
     assert updated.ensemble == base.ensemble
+    assert updated.rasterize_notes is True
+    assert base.with_overrides(rasterize_notes=False).rasterize_notes is False
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        base.minimal = True
 
 
 def test_compute_plot_bounds_respects_score_duration():
@@ -48,6 +56,32 @@ def test_compute_plot_bounds_respects_score_duration():
     assert bounds.max_pitch == 65.0
 
 
+def test_note_event_array_inputs_match_lists():
+    events = [
+        _make_event(62, 1.5, 0.5),
+        _make_event(60, 0.0, 2.0),
+        _make_event(71, 3.0, 1.0),
+    ]
+    events[1].instrument_label = "other"
+    array = NoteEventArray.from_events(events)
+
+    assert compute_plot_bounds(array, score_duration=None) == compute_plot_bounds(events, score_duration=None)
+
+    list_context = _prepare_color_context(events, family_mode=False, ensemble="ungrouped")
+    array_context = _prepare_color_context(array, family_mode=False, ensemble="ungrouped")
+    assert array_context == list_context
+    assert array_context.legend_labels == ["test", "other"]
+    assert array_context.event_colors.shape == (3, 4)
+    assert array_context.palette.shape == (2, 4)
+    assert array_context.labels_to_idx == {"test": 0, "other": 1}
+    np.testing.assert_array_equal(
+        array_context.palette[array_context.labels_to_idx["other"]], array_context.event_colors[1]
+    )
+    np.testing.assert_array_equal(array_context.event_colors, list_context.event_colors)
+    # Events sharing a label share a color row
+    np.testing.assert_array_equal(array_context.event_colors[0], array_context.event_colors[2])
+
+
 def test_compute_figure_dimensions_scales_with_range():
     bounds = PlotBounds(
         min_duration=1.0,
@@ -106,6 +140,25 @@ def test_connection_config_alpha_fade():
     assert cfg.alpha_for_length(5.0) == pytest.approx(0.3)
 
 
+@pytest.mark.parametrize(
+    "cfg",
+    [
+        ConnectionConfig(alpha=0.6, min_alpha=0.3, fade_start=2.0, fade_end=4.0),
+        ConnectionConfig(alpha=1.4, min_alpha=0.1, fade_start=0.0, fade_end=8.0),
+        ConnectionConfig(alpha=0.5, min_alpha=0.2, fade_start=4.0, fade_end=4.0),
+    ],
+)
+def test_connection_config_alpha_for_lengths_matches_scalar(cfg):
+    lengths = [0.0, 1.0, 2.0, 2.5, 3.999, 4.0, 6.0, 100.0]
+    base_alphas = [0.2, 0.9, 0.5, 1.2, 0.05, 0.7, 0.4, 0.8]
+
+    assert cfg.alpha_for_lengths(lengths).tolist() == [cfg.alpha_for_length(length) for length in lengths]
+    assert cfg.alpha_for_lengths(lengths, base_alpha=base_alphas, min_alpha=0.25).tolist() == [
+        cfg.alpha_for_length(length, base_alpha=base, min_alpha=0.25)
+        for length, base in zip(lengths, base_alphas)
+    ]
+
+
 def _note_alpha(dynamic_level: float) -> float:
     dynamic_range = MAX_DYNAMIC_LEVEL - MIN_DYNAMIC_LEVEL
     normalized = 0.0 if dynamic_range == 0 else (dynamic_level - MIN_DYNAMIC_LEVEL) / dynamic_range